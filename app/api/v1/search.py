@@ -4,13 +4,40 @@ from typing import List, Optional
 
 from fastapi import APIRouter, HTTPException, Query
 
+from app.core.config import rag_config, settings
 from app.core.exceptions import RAGAPIException
-from app.models.schemas import SearchRequest, RAGSearchResponse
+from app.models.schemas import (
+    BatchSearchRequest,
+    BatchSearchResponse,
+    EmbedRequest,
+    EmbedResponse,
+    RAGSearchResponse,
+    SearchRequest,
+)
 from app.services.rag_search_service import RAGSearchService
 
 router = APIRouter()
 
 
+def _check_embedding_model(embedding_model: Optional[str]) -> None:
+    """Reject precomputed embeddings produced by a different model than the index uses."""
+    if embedding_model != settings.vertex_ai_embedding_model_name:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Precomputed embeddings must come from model '{settings.vertex_ai_embedding_model_name}'",
+        )
+
+
+def _check_embedding_dimensions(embeddings: List[List[float]]) -> None:
+    """Reject precomputed embeddings whose length does not match the index dimensions."""
+    expected = rag_config.vector_search.get("dimensions")
+    if expected is not None and any(len(embedding) != expected for embedding in embeddings):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Precomputed embeddings must have {expected} dimensions",
+        )
+
+
 @router.post("/rag", response_model=RAGSearchResponse)
 async def rag_search_documents(
     search_request: SearchRequest
@@ -22,7 +49,13 @@ async def rag_search_documents(
     - **ktop**: Number of top results to retrieve (default: 10)
     - **threshold**: Similarity threshold (default: 0.7)
     - **file_ids**: Optional list of file IDs to search within
+    - **fraction_leaf_nodes_to_search**: Optional fraction of index leaf nodes to search, trading recall for latency
+    - **embedding**: Optional precomputed query embedding (from `/embed`), with its **embedding_model**
     """
+    if search_request.embedding is not None:
+        _check_embedding_model(search_request.embedding_model)
+        _check_embedding_dimensions([search_request.embedding])
+    
     try:
         rag_search_service = RAGSearchService()
         response = await rag_search_service.search_documents(search_request)
@@ -34,6 +67,77 @@ async def rag_search_documents(
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.post("/rag/batch", response_model=BatchSearchResponse)
+async def rag_search_documents_batch(
+    batch_request: BatchSearchRequest
+):
+    """
+    Batched RAG search: run several queries in one request.
+    
+    Query embeddings and vector searches are issued as single batched calls;
+    results are returned in the same order as the queries.
+    
+    - **queries**: List of search query texts (1-50)
+    - **ktop**: Number of top results to retrieve per query (default: 10)
+    - **threshold**: Similarity threshold (default: 0.3)
+    - **file_ids**: Optional list of file IDs to search within
+    - **tags**: Optional list of tags to filter by
+    - **fraction_leaf_nodes_to_search**: Optional fraction of index leaf nodes to search, trading recall for latency
+    - **embeddings**: Optional precomputed query embeddings (from `/embed`), one per query, with their **embedding_model**
+    """
+    if batch_request.embeddings is not None:
+        _check_embedding_model(batch_request.embedding_model)
+        if len(batch_request.embeddings) != len(batch_request.queries):
+            raise HTTPException(status_code=400, detail="Expected one embedding per query")
+        _check_embedding_dimensions(batch_request.embeddings)
+    
+    try:
+        rag_search_service = RAGSearchService()
+        response = await rag_search_service.search_documents_batch(batch_request)
+        return response
+        
+    except RAGAPIException as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.get("/embed")
+async def get_embedding_model():
+    """
+    Report the embedding model and dimensions used for RAG search.
+    
+    Lets clients validate cached embeddings without paying for an embedding call.
+    """
+    return {
+        "model": settings.vertex_ai_embedding_model_name,
+        "dimensions": rag_config.vector_search.get("dimensions"),
+    }
+
+
+@router.post("/embed", response_model=EmbedResponse)
+async def embed_queries(
+    embed_request: EmbedRequest
+):
+    """
+    Embed search queries with the model used for RAG search.
+    
+    Clients can cache the returned embeddings and pass them back to `/rag`
+    or `/rag/batch` to skip re-embedding repeated queries.
+    
+    - **queries**: List of search query texts (1-50)
+    """
+    try:
+        rag_search_service = RAGSearchService()
+        response = await rag_search_service.embed_queries(embed_request)
+        return response
+        
+    except RAGAPIException as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/rag", response_model=RAGSearchResponse)
 async def rag_search_documents_get(
     query: str = Query(..., min_length=1, max_length=1000, description="Search query"),
@@ -147,7 +147,7 @@ async def generate_document_title(file_content: bytes, filename: str, content_ty
             from pdf2image import convert_from_bytes
             import io
             
-            images = convert_from_bytes(file_content, first_page=1, last_page=1)
+            images = convert_from_bytes(file_content, first_page=1, last_page=1, use_pdftocairo=True)
             if images:
                 # Convert first page to text using Gemini
                 image = images[0]
@@ -530,6 +530,7 @@ async def get_upload_status(filename: str = Path(...)):
     This endpoint provides information about:
     - File existence in uploads directory
     - Number of chunks and embeddings
+    - Whether all embeddings are served by the vector search index (ready)
     - Last modified date
     """
     try:
@@ -545,15 +546,25 @@ async def get_upload_status(filename: str = Path(...)):
             return {
                 "filename": filename,
                 "exists": False,
+                "ready": False,
+                "embeddings_stored": 0,
                 "message": "File not found in uploads directory"
             }
         
         # Get file information
         blob.reload()
         
+        # The file is ready once every stored embedding is served by the index
+        datapoint_ids_str = (blob.metadata or {}).get("datapoint_ids", "")
+        datapoint_ids = datapoint_ids_str.split(",") if datapoint_ids_str else []
+        embeddings_served = vector_search_service.count_served_datapoints(datapoint_ids) if datapoint_ids else 0
+        
         return {
             "filename": filename,
             "exists": True,
+            "ready": bool(datapoint_ids) and embeddings_served == len(datapoint_ids),
+            "embeddings_stored": len(datapoint_ids),
+            "embeddings_served": embeddings_served,
             "upload_path": upload_path,
             "file_size": blob.size,
             "content_type": blob.content_type,
@@ -226,13 +226,15 @@ async def _analyze_image_with_gemini(file_content: bytes, filename: str, content
 
 
 async def _analyze_pdf_with_gemini(file_content: bytes, filename: str, content_type: str) -> dict:
-    """Analyze PDF content using real Gemini API (first 3 pages)."""
+    """Analyze PDF content using real Gemini API (first page)."""
     try:
         from pdf2image import convert_from_bytes
         import io
         
-        # Convert PDF to images (first 3 pages)
-        images = convert_from_bytes(file_content, first_page=1, last_page=3)
+        # Convert the first page to an image (only that page is analyzed)
+        images = convert_from_bytes(
+            file_content, first_page=1, last_page=1, use_pdftocairo=True
+        )
         
         if not images:
             return _get_fallback_analysis(filename, "pdf")
@@ -48,6 +48,28 @@ class SearchRequest(BaseModel):
     threshold: Optional[float] = Field(default=None, ge=0.0, le=1.0, description="Similarity threshold")
     file_ids: Optional[List[str]] = Field(default=None, max_items=10, description="Optional list of file IDs to search within")
     tags: Optional[List[str]] = Field(default=None, max_items=10, description="Optional list of tags to filter by")
+    fraction_leaf_nodes_to_search: Optional[float] = Field(
+        default=None, gt=0.0, le=1.0, description="Fraction of index leaf nodes to search (overrides the deployed index default)"
+    )
+    embedding: Optional[List[float]] = Field(default=None, description="Precomputed query embedding; skips embedding the query")
+    embedding_model: Optional[str] = Field(default=None, description="Model that produced the precomputed embedding")
+
+
+class BatchSearchRequest(BaseModel):
+    """Request model for batched RAG search."""
+
+    queries: List[str] = Field(..., min_items=1, max_items=50, description="Search queries to run in one request")
+    ktop: Optional[int] = Field(default=None, ge=1, le=50, description="Number of top results to retrieve")
+    threshold: Optional[float] = Field(default=None, ge=0.0, le=1.0, description="Similarity threshold")
+    file_ids: Optional[List[str]] = Field(default=None, max_items=10, description="Optional list of file IDs to search within")
+    tags: Optional[List[str]] = Field(default=None, max_items=10, description="Optional list of tags to filter by")
+    fraction_leaf_nodes_to_search: Optional[float] = Field(
+        default=None, gt=0.0, le=1.0, description="Fraction of index leaf nodes to search (overrides the deployed index default)"
+    )
+    embeddings: Optional[List[List[float]]] = Field(
+        default=None, description="Precomputed query embeddings, one per query; skips embedding the queries"
+    )
+    embedding_model: Optional[str] = Field(default=None, description="Model that produced the precomputed embeddings")
 
 
 class SearchResult(BaseModel):
@@ -86,6 +108,33 @@ class RAGSearchResponse(BaseModel):
     search_parameters: Dict[str, Any]
 
 
+class BatchSearchResponse(BaseModel):
+    """Response model for batched RAG search, with one result per query in request order."""
+
+    success: bool
+    results: List[RAGSearchResponse]
+    total_queries: int
+    processing_time_ms: float
+    vector_search_ms: Optional[float] = Field(
+        default=None, description="Time spent in the batched vector search call alone"
+    )
+
+
+class EmbedRequest(BaseModel):
+    """Request model for query embedding."""
+
+    queries: List[str] = Field(..., min_items=1, max_items=50, description="Search queries to embed")
+
+
+class EmbedResponse(BaseModel):
+    """Response model for query embedding, with one embedding per query in request order."""
+
+    success: bool
+    model: str
+    embeddings: List[List[float]]
+    processing_time_ms: float
+
+
 class SearchResponse(BaseModel):
     """Legacy response model for RAG search."""
 
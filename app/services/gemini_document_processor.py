@@ -2,6 +2,7 @@
 
 import base64
 import io
+import os
 from typing import Any, Dict, List, Optional
 
 import pandas as pd
@@ -160,9 +161,14 @@ class GeminiDocumentProcessor:
     ) -> List[ChunkInfo]:
         """Process PDF by converting pages to images and using Gemini Flash."""
         try:
-            # Convert PDF pages to images
+            # Convert PDF pages to images (pdftocairo, pages rendered in parallel)
             images = convert_from_bytes(
-                file_content, dpi=300, first_page=1, last_page=None
+                file_content,
+                dpi=300,
+                first_page=1,
+                last_page=None,
+                thread_count=max(1, (os.cpu_count() or 1) // 2),
+                use_pdftocairo=True,
             )
 
             chunks = []
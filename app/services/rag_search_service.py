@@ -1,5 +1,6 @@
 """Enhanced RAG search service with real vector search integration and reranking."""
 
+import asyncio
 import os
 import time
 from typing import List, Dict, Any, Optional
@@ -24,6 +25,10 @@ from app.core.config import settings
 from app.core.exceptions import RAGAPIException
 from app.utils.vector_search import VectorSearchService
 from app.models.schemas import (
+    BatchSearchRequest,
+    BatchSearchResponse,
+    EmbedRequest,
+    EmbedResponse,
     SearchRequest, 
     SearchResult, 
     RAGSearchFileInfo, 
@@ -83,8 +88,8 @@ class RAGSearchService:
         start_time = time.time()
         
         try:
-            # Get query embedding
-            query_embedding = await self._get_query_embedding(search_request.query)
+            # Get query embedding, reusing a precomputed one when supplied
+            query_embedding = search_request.embedding or await self._get_query_embedding(search_request.query)
             
             # Perform vector search (no threshold initially to get more candidates)
             ktop = search_request.ktop if search_request.ktop is not None else 10
@@ -95,62 +100,161 @@ class RAGSearchService:
                 query_embedding=query_embedding,
                 ktop=ktop,  # Use ktop directly
                 file_ids=search_request.file_ids,
-                tags=search_request.tags
+                tags=search_request.tags,
+                fraction_leaf_nodes_to_search=search_request.fraction_leaf_nodes_to_search
             )
             
-            print(f"Vector search returned {len(search_results)} results")
-            
-            # Apply reranking using Google's semantic reranker
-            reranked_results = await self._rerank_results(
+            return await self._build_search_response(
                 query=search_request.query,
-                search_results=search_results
+                search_results=search_results,
+                ktop=ktop,
+                threshold=threshold,
+                file_ids=search_request.file_ids,
+                tags=search_request.tags,
+                start_time=start_time,
+                fraction_leaf_nodes_to_search=search_request.fraction_leaf_nodes_to_search
             )
             
-            print(f"Reranked to {len(reranked_results)} results")
-            
-            # Apply threshold after reranking
-            filtered_results = [
-                result for result in reranked_results 
-                if result.distance >= threshold  # Higher distance = better similarity
-            ]
-            
-            print(f"After threshold {threshold}: {len(filtered_results)} results")
-            
-            # Final results are already limited to ktop from initial search
-            final_results = filtered_results
-            
-            # Group results by file
-            files_dict = await self._group_results_by_file(final_results)
-            
-            # Get file metadata from GCS
-            files_with_metadata = await self._enrich_with_file_metadata(files_dict)
+        except Exception as e:
+            raise RAGAPIException(f"Error performing RAG search: {str(e)}")
+    
+    async def search_documents_batch(self, batch_request: BatchSearchRequest) -> BatchSearchResponse:
+        """
+        Search documents for several queries in one pass.
+        
+        All query embeddings are generated with a single embedding call and all
+        vector searches are sent as a single multi-query request; reranking and
+        response generation then run concurrently per query as in search_documents.
+        
+        Args:
+            batch_request: Queries plus the search parameters shared by all of them
             
-            # Generate RAG response using Gemini
-            rag_response = await self._generate_rag_response(
-                query=search_request.query,
-                search_results=final_results
+        Returns:
+            BatchSearchResponse with one RAGSearchResponse per query, in request order
+        """
+        start_time = time.time()
+        
+        try:
+            ktop = batch_request.ktop if batch_request.ktop is not None else 10
+            threshold = batch_request.threshold if batch_request.threshold is not None else 0.3
+            
+            query_embeddings = batch_request.embeddings or await self._get_query_embeddings(batch_request.queries)
+            
+            vector_search_start = time.time()
+            batch_search_results = await self._perform_vector_search_batch(
+                query_embeddings=query_embeddings,
+                ktop=ktop,
+                file_ids=batch_request.file_ids,
+                tags=batch_request.tags,
+                fraction_leaf_nodes_to_search=batch_request.fraction_leaf_nodes_to_search
             )
+            vector_search_ms = (time.time() - vector_search_start) * 1000
+            
+            # Rerank and generate responses for all queries concurrently
+            post_processing_start = time.time()
+            results = list(await asyncio.gather(*(
+                self._build_search_response(
+                    query=query,
+                    search_results=search_results,
+                    ktop=ktop,
+                    threshold=threshold,
+                    file_ids=batch_request.file_ids,
+                    tags=batch_request.tags,
+                    start_time=post_processing_start,
+                    fraction_leaf_nodes_to_search=batch_request.fraction_leaf_nodes_to_search
+                )
+                for query, search_results in zip(batch_request.queries, batch_search_results)
+            )))
             
             processing_time = (time.time() - start_time) * 1000  # Convert to milliseconds
             
-            return RAGSearchResponse(
+            return BatchSearchResponse(
                 success=True,
-                query=search_request.query,
-                files=files_with_metadata,
-                total_files=len(files_with_metadata),
-                total_chunks=len(final_results),
-                rag_response=rag_response,
+                results=results,
+                total_queries=len(results),
                 processing_time_ms=processing_time,
-                search_parameters={
-                    "ktop": ktop,
-                    "threshold": threshold,
-                    "file_ids": search_request.file_ids,
-                    "tags": search_request.tags
-                }
+                vector_search_ms=vector_search_ms
             )
             
         except Exception as e:
-            raise RAGAPIException(f"Error performing RAG search: {str(e)}")
+            raise RAGAPIException(f"Error performing batch RAG search: {str(e)}")
+    
+    async def embed_queries(self, embed_request: EmbedRequest) -> EmbedResponse:
+        """Embed search queries so clients can cache them and pass them back to search."""
+        start_time = time.time()
+        
+        embeddings = await self._get_query_embeddings(embed_request.queries)
+        
+        return EmbedResponse(
+            success=True,
+            model=settings.vertex_ai_embedding_model_name,
+            embeddings=embeddings,
+            processing_time_ms=(time.time() - start_time) * 1000
+        )
+    
+    async def _build_search_response(
+        self,
+        query: str,
+        search_results: List[SearchResult],
+        ktop: int,
+        threshold: float,
+        file_ids: Optional[List[str]],
+        tags: Optional[List[str]],
+        start_time: float,
+        fraction_leaf_nodes_to_search: Optional[float] = None
+    ) -> RAGSearchResponse:
+        """Rerank, filter and group vector search results and generate the RAG response for one query."""
+        print(f"Vector search returned {len(search_results)} results")
+        
+        # Apply reranking using Google's semantic reranker
+        reranked_results = await self._rerank_results(
+            query=query,
+            search_results=search_results
+        )
+        
+        print(f"Reranked to {len(reranked_results)} results")
+        
+        # Apply threshold after reranking
+        filtered_results = [
+            result for result in reranked_results 
+            if result.distance >= threshold  # Higher distance = better similarity
+        ]
+        
+        print(f"After threshold {threshold}: {len(filtered_results)} results")
+        
+        # Final results are already limited to ktop from initial search
+        final_results = filtered_results
+        
+        # Group results by file
+        files_dict = await self._group_results_by_file(final_results)
+        
+        # Get file metadata from GCS
+        files_with_metadata = await self._enrich_with_file_metadata(files_dict)
+        
+        # Generate RAG response using Gemini
+        rag_response = await self._generate_rag_response(
+            query=query,
+            search_results=final_results
+        )
+        
+        processing_time = (time.time() - start_time) * 1000  # Convert to milliseconds
+        
+        return RAGSearchResponse(
+            success=True,
+            query=query,
+            files=files_with_metadata,
+            total_files=len(files_with_metadata),
+            total_chunks=len(final_results),
+            rag_response=rag_response,
+            processing_time_ms=processing_time,
+            search_parameters={
+                "ktop": ktop,
+                "threshold": threshold,
+                "file_ids": file_ids,
+                "tags": tags,
+                "fraction_leaf_nodes_to_search": fraction_leaf_nodes_to_search
+            }
+        )
     
     async def _rerank_results(
         self, 
@@ -200,7 +304,8 @@ class RAGSearchService:
             
             # Perform reranking
             print(f"Reranking {len(search_results)} results with Discovery Engine")
-            response = self.discovery_client.rank(request=request)
+            # The rank call is blocking; run it off the event loop
+            response = await asyncio.to_thread(self.discovery_client.rank, request=request)
             
             # Map reranked results back to SearchResult objects
             reranked_results = []
@@ -240,12 +345,26 @@ class RAGSearchService:
         except Exception as e:
             raise RAGAPIException(f"Error generating query embedding: {str(e)}")
     
+    async def _get_query_embeddings(self, queries: List[str]) -> List[List[float]]:
+        """Get embeddings for several search queries with a single embedding call."""
+        try:
+            # A list of contents is embedded in one batched request, one embedding per query
+            result = genai.embed_content(
+                model=settings.vertex_ai_embedding_model_name,
+                content=queries,
+                task_type="QUESTION_ANSWERING"
+            )
+            return result['embedding']
+        except Exception as e:
+            raise RAGAPIException(f"Error generating query embeddings: {str(e)}")
+    
     async def _perform_vector_search(
         self, 
         query_embedding: List[float], 
         ktop: int, 
         file_ids: Optional[List[str]] = None,
-        tags: Optional[List[str]] = None
+        tags: Optional[List[str]] = None,
+        fraction_leaf_nodes_to_search: Optional[float] = None
     ) -> List[SearchResult]:
         """Perform vector search using the existing VectorSearchService."""
         try:
@@ -262,46 +381,84 @@ class RAGSearchService:
             results = vector_service.search_similar(
                 query_embedding=query_embedding,
                 top_k=ktop,
-                filters=filters
+                filters=filters,
+                fraction_leaf_nodes_to_search=fraction_leaf_nodes_to_search
             )
             
-            # Process results (no threshold filtering here)
-            print(f"Vector search returned {len(results)} results")
-            search_results = []
-            for i, result in enumerate(results):
-                distance_score = result["distance"]  # Use distance field
-                print(f"Result {i}: distance={distance_score:.3f}")
-                
-                metadata = result.get("metadata", {})
-                
-                # Apply file filter if specified
-                if file_ids and metadata.get("filename") not in file_ids:
-                    continue
-                
-                # Handle metadata values that might be lists
-                def get_metadata_value(key, default=""):
-                    value = metadata.get(key, default)
-                    if isinstance(value, list) and value:
-                        return value[0]  # Take first value if it's a list
-                    return value
-                
-                search_result = SearchResult(
-                    content=get_metadata_value("content", ""),
-                    file_id=get_metadata_value("filename", ""),
-                    filename=get_metadata_value("filename", ""),
-                    chunk_index=int(get_metadata_value("chunk_index", 0)),
-                    distance=distance_score,
-                    metadata=metadata
-                )
-                search_results.append(search_result)
+            return self._to_search_results(results, file_ids)
             
-            print(f"Processed {len(search_results)} results from vector search")
-            return search_results
+        except Exception as e:
+            print(f"Vector search error details: {str(e)}")
+            raise RAGAPIException(f"Error performing vector search: {str(e)}")
+    
+    async def _perform_vector_search_batch(
+        self, 
+        query_embeddings: List[List[float]], 
+        ktop: int, 
+        file_ids: Optional[List[str]] = None,
+        tags: Optional[List[str]] = None,
+        fraction_leaf_nodes_to_search: Optional[float] = None
+    ) -> List[List[SearchResult]]:
+        """Perform vector search for several query embeddings in a single request."""
+        try:
+            vector_service = VectorSearchService()
+            
+            filters = None
+            if tags:
+                filters = {"tags": tags}
+            
+            batch_results = vector_service.search_similar_batch(
+                query_embeddings=query_embeddings,
+                top_k=ktop,
+                filters=filters,
+                fraction_leaf_nodes_to_search=fraction_leaf_nodes_to_search
+            )
+            
+            return [self._to_search_results(results, file_ids) for results in batch_results]
             
         except Exception as e:
             print(f"Vector search error details: {str(e)}")
             raise RAGAPIException(f"Error performing vector search: {str(e)}")
     
+    def _to_search_results(
+        self,
+        results: List[Dict[str, Any]],
+        file_ids: Optional[List[str]] = None
+    ) -> List[SearchResult]:
+        """Convert raw vector search neighbors into SearchResult objects."""
+        # Process results (no threshold filtering here)
+        print(f"Vector search returned {len(results)} results")
+        search_results = []
+        for i, result in enumerate(results):
+            distance_score = result["distance"]  # Use distance field
+            print(f"Result {i}: distance={distance_score:.3f}")
+            
+            metadata = result.get("metadata", {})
+            
+            # Apply file filter if specified
+            if file_ids and metadata.get("filename") not in file_ids:
+                continue
+            
+            # Handle metadata values that might be lists
+            def get_metadata_value(key, default=""):
+                value = metadata.get(key, default)
+                if isinstance(value, list) and value:
+                    return value[0]  # Take first value if it's a list
+                return value
+            
+            search_result = SearchResult(
+                content=get_metadata_value("content", ""),
+                file_id=get_metadata_value("filename", ""),
+                filename=get_metadata_value("filename", ""),
+                chunk_index=int(get_metadata_value("chunk_index", 0)),
+                distance=distance_score,
+                metadata=metadata
+            )
+            search_results.append(search_result)
+        
+        print(f"Processed {len(search_results)} results from vector search")
+        return search_results
+    
     async def _group_results_by_file(self, search_results: List[SearchResult]) -> Dict[str, List[SearchResult]]:
         """Group search results by filename."""
         files_dict = {}
@@ -395,8 +552,8 @@ User Question: {query}
 
 Please provide a direct answer based on the context above. If the context doesn't contain enough information to answer the question, simply state that the information is not available in the knowledge base. Keep your response focused and avoid mentioning specific chunks or sources."""
 
-            # Generate response using Gemini
-            response = self.gemini_model.generate_content(prompt)
+            # Generate response using Gemini (blocking call, run off the event loop)
+            response = await asyncio.to_thread(self.gemini_model.generate_content, prompt)
             
             return response.text if response.text else "I apologize, but I couldn't generate a response at this time. Please try again."
             
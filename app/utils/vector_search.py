@@ -18,6 +18,7 @@ from google.cloud.aiplatform_v1.types import (
     FindNeighborsRequest,
     Index as GCPIndex,
     IndexDatapoint,
+    ReadIndexDatapointsRequest,
     RemoveDatapointsRequest,
     UpsertDatapointsRequest,
 )
@@ -161,6 +162,7 @@ class VectorSearchService:
         top_k: int = 5,
         filters: Optional[Dict[str, Union[str, int, float, List[Any]]]] = None,
         return_full_datapoint: bool = True,
+        fraction_leaf_nodes_to_search: Optional[float] = None,
     ) -> List[Dict[str, Any]]:
         """
         Search for similar vectors using server-side filtered nearest-neighbor search.
@@ -170,6 +172,7 @@ class VectorSearchService:
             top_k: Number of neighbors to return
             filters: Optional dict of filterable facets (translated to server-side restricts)
             return_full_datapoint: Whether to include restricts in response for metadata reconstruction
+            fraction_leaf_nodes_to_search: Optional override of the fraction of leaf nodes searched (recall vs latency)
 
         Returns:
             List of dictionaries containing:
@@ -179,45 +182,131 @@ class VectorSearchService:
                 - metadata: Dict[str, Any] - Extracted metadata from restricts
         """
         self._validate_dims(query_embedding)
-        restricts = _build_restricts(filters)
 
         try:
-            q = FindNeighborsRequest.Query(
+            neighbors = self._find_neighbors(
+                [query_embedding], top_k, filters, return_full_datapoint, fraction_leaf_nodes_to_search
+            )
+            return neighbors[0] if neighbors else []
+        except Exception as e:
+            logger.exception("Search failed")
+            raise RAGAPIException(f"search_similar failed: {e}") from e
+
+    def search_similar_batch(
+        self,
+        query_embeddings: List[List[float]],
+        top_k: int = 5,
+        filters: Optional[Dict[str, Union[str, int, float, List[Any]]]] = None,
+        return_full_datapoint: bool = True,
+        fraction_leaf_nodes_to_search: Optional[float] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search for several query vectors with a single nearest-neighbor request.
+
+        Args:
+            query_embeddings: The vectors to search with
+            top_k: Number of neighbors to return per query
+            filters: Optional dict of filterable facets (translated to server-side restricts)
+            return_full_datapoint: Whether to include restricts in response for metadata reconstruction
+            fraction_leaf_nodes_to_search: Optional override of the fraction of leaf nodes searched (recall vs latency)
+
+        Returns:
+            One result list per query embedding, in input order, each shaped like
+            the output of `search_similar`.
+        """
+        if not query_embeddings:
+            return []
+        for query_embedding in query_embeddings:
+            self._validate_dims(query_embedding)
+
+        try:
+            return self._find_neighbors(
+                query_embeddings, top_k, filters, return_full_datapoint, fraction_leaf_nodes_to_search
+            )
+        except Exception as e:
+            logger.exception("Batch search failed")
+            raise RAGAPIException(f"search_similar_batch failed: {e}") from e
+
+    def _find_neighbors(
+        self,
+        query_embeddings: List[List[float]],
+        top_k: int,
+        filters: Optional[Dict[str, Union[str, int, float, List[Any]]]],
+        return_full_datapoint: bool,
+        fraction_leaf_nodes_to_search: Optional[float] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """Run one FindNeighbors request and return the neighbors of each query in order."""
+        restricts = _build_restricts(filters)
+
+        queries = [
+            FindNeighborsRequest.Query(
                 datapoint=IndexDatapoint(feature_vector=query_embedding),
                 neighbor_count=top_k,
+                # 0 keeps the leaf node fraction configured on the deployed index
+                fraction_leaf_nodes_to_search_override=fraction_leaf_nodes_to_search or 0.0,
             )
+            for query_embedding in query_embeddings
+        ]
+
+        resp = self.match_client.find_neighbors(
+            request=FindNeighborsRequest(
+                index_endpoint=self.endpoint_name,
+                deployed_index_id=settings.vector_search_deployed_index_id,
+                queries=queries,
+                return_full_datapoint=return_full_datapoint,
+            ),
+            retry=self.DEFAULT_RETRY,
+        )
+
+        all_results: List[List[Dict[str, Any]]] = []
+        for qr in resp.nearest_neighbors:
+            results: List[Dict[str, Any]] = []
+            for nb in qr.neighbors:
+                dist = nb.distance
+                meta: Dict[str, Union[str, List[str]]] = {}
+                if return_full_datapoint and nb.datapoint.restricts:
+                    for r in nb.datapoint.restricts:
+                        # keep list to avoid lossy comma-joining
+                        if r.allow_list:
+                            meta[r.namespace] = list(r.allow_list)
+                results.append(
+                    {
+                        "id": nb.datapoint.datapoint_id,
+                        "distance": dist,
+                        "metadata": meta,
+                    }
+                )
+            all_results.append(results)
+        return all_results
 
-            resp = self.match_client.find_neighbors(
-                request=FindNeighborsRequest(
+    def count_served_datapoints(self, datapoint_ids: Iterable[str]) -> int:
+        """
+        Count how many of the given datapoints the deployed index already serves.
+
+        Streaming upserts become visible to queries shortly after they are written;
+        this lets callers poll for that instead of sleeping a fixed time.
+
+        Args:
+            datapoint_ids: Iterable of datapoint IDs to look up
+
+        Returns:
+            Number of the datapoints readable from the deployed index
+        """
+        ids = [str(x) for x in datapoint_ids if str(x)]
+        if not ids:
+            return 0
+        try:
+            resp = self.match_client.read_index_datapoints(
+                request=ReadIndexDatapointsRequest(
                     index_endpoint=self.endpoint_name,
                     deployed_index_id=settings.vector_search_deployed_index_id,
-                    queries=[q],
-                    return_full_datapoint=return_full_datapoint,
-                ),
-                retry=self.DEFAULT_RETRY,
+                    ids=ids,
+                )
             )
-
-            results: List[Dict[str, Any]] = []
-            for qr in resp.nearest_neighbors:
-                for nb in qr.neighbors:
-                    dist = nb.distance
-                    meta: Dict[str, Union[str, List[str]]] = {}
-                    if return_full_datapoint and nb.datapoint.restricts:
-                        for r in nb.datapoint.restricts:
-                            # keep list to avoid lossy comma-joining
-                            if r.allow_list:
-                                meta[r.namespace] = list(r.allow_list)
-                    results.append(
-                        {
-                            "id": nb.datapoint.datapoint_id,
-                            "distance": dist,
-                            "metadata": meta,
-                        }
-                    )
-            return results
+            return len(resp.datapoints)
         except Exception as e:
-            logger.exception("Search failed")
-            raise RAGAPIException(f"search_similar failed: {e}") from e
+            logger.exception("Reading datapoints failed")
+            raise RAGAPIException(f"count_served_datapoints failed: {e}") from e
 
     def remove_embeddings_by_ids(self, datapoint_ids: Iterable[str]) -> int:
         """
@@ -3,6 +3,7 @@
 
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from google.cloud import storage
 from google.cloud.exceptions import NotFound
@@ -13,6 +14,29 @@ sys.path.append(str(Path(__file__).parent.parent))
 from app.core.config import settings
 
 
+def _clear_folder(bucket, folder):
+    """Delete every blob under a folder prefix.
+    
+    Returns a tuple of (folder, deleted count, log lines) so output can be
+    printed in order once all folders are done.
+    """
+    blob_count = 0
+    messages = []
+    
+    # Stream blobs with the folder prefix, fetching only the names needed to delete them
+    blobs = bucket.list_blobs(prefix=f"{folder}/", fields="items(name),nextPageToken")
+    
+    for blob in blobs:
+        try:
+            blob.delete()
+            blob_count += 1
+            messages.append(f"  Deleted: {blob.name}")
+        except Exception as e:
+            messages.append(f"  Error deleting {blob.name}: {e}")
+    
+    return folder, blob_count, messages
+
+
 def clear_storage_folders():
     """Clear both _tmp and uploads folders in Google Cloud Storage."""
     try:
@@ -35,28 +59,23 @@ def clear_storage_folders():
         # Folders to clear
         folders_to_clear = ["_tmp", "uploads"]
         
+        # Folders are independent prefixes, so clear them concurrently
+        with ThreadPoolExecutor(max_workers=len(folders_to_clear)) as executor:
+            results = list(executor.map(lambda folder: _clear_folder(bucket, folder), folders_to_clear))
+        
         total_deleted = 0
         
-        for folder in folders_to_clear:
+        for folder, blob_count, messages in results:
             print(f"\nClearing folder: {folder}/")
-            
-            # List all blobs with the folder prefix
-            blobs = bucket.list_blobs(prefix=f"{folder}/")
-            blob_count = 0
-            
-            for blob in blobs:
-                try:
-                    blob.delete()
-                    blob_count += 1
-                    total_deleted += 1
-                    print(f"  Deleted: {blob.name}")
-                except Exception as e:
-                    print(f"  Error deleting {blob.name}: {e}")
+            for message in messages:
+                print(message)
             
             if blob_count == 0:
                 print(f"  No files found in {folder}/")
             else:
                 print(f"  Deleted {blob_count} files from {folder}/")
+            
+            total_deleted += blob_count
         
         print(f"\n=== Summary ===")
         print(f"Total files deleted: {total_deleted}")
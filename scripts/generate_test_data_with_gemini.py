@@ -279,21 +279,19 @@ def create_image_with_text(output_path: Path):
             font_small = ImageFont.load_default()
     
     # Draw text
-    lines = card_content.strip().split('\n')
-    y_position = 50
-    
-    for i, line in enumerate(lines):
-        if line.strip():
-            if i == 0:  # Company name
-                draw.text((50, y_position), line.strip(), fill='darkblue', font=font_large)
-            elif i == 1:  # Name
-                draw.text((50, y_position), line.strip(), fill='black', font=font_medium)
-            else:  # Other details
-                draw.text((50, y_position), line.strip(), fill='darkgreen', font=font_small)
-        y_position += 40
+    lines = [line.strip() for line in card_content.strip().split('\n')]
     
-    # Save image
-    image.save(output_path, 'PNG')
+    if len(lines) > 0 and lines[0]:  # Company name
+        draw.text((50, 50), lines[0], fill='darkblue', font=font_large)
+    if len(lines) > 1 and lines[1]:  # Name
+        draw.text((50, 90), lines[1], fill='black', font=font_medium)
+    
+    # Other details share a font and colour, so lay them out in a single call
+    if len(lines) > 2:
+        draw.multiline_text((50, 130), "\n".join(lines[2:]), fill='darkgreen', font=font_small, spacing=22, align='left')
+    
+    # Save image (fast zlib level; this is a throwaway test asset)
+    image.save(output_path, 'PNG', optimize=False, compress_level=1)
     print(f"Created image: {output_path}")
 
 
@@ -3,15 +3,54 @@
 
 import os
 import json
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 import io
 
+# Shared reportlab styles, built once at import time and reused by every document
+_STYLES = getSampleStyleSheet()
+
+_SIMPLE_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 14),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+_MAIN_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+_NESTED_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.lightblue),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.lightgrey),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
 
 def create_test_data():
     """Create test documents for different content types."""
@@ -25,25 +64,32 @@ def create_test_data():
     
     print("Creating test documents...")
     
-    # Create simple table PDF
-    create_simple_table_pdf(test_data_dir / "tables" / "simple_table.pdf")
-    
-    # Create nested table PDF
-    create_nested_table_pdf(test_data_dir / "tables" / "nested_tables.pdf")
-    
-    # Create text PDF
-    create_text_pdf(test_data_dir / "text" / "sample_text.pdf")
+    # Each document is independent, so build them in parallel worker processes
+    tasks = [
+        (create_simple_table_pdf, test_data_dir / "tables" / "simple_table.pdf"),
+        (create_nested_table_pdf, test_data_dir / "tables" / "nested_tables.pdf"),
+        (create_text_pdf, test_data_dir / "text" / "sample_text.pdf"),
+        (create_image_with_text, test_data_dir / "images" / "image_with_text.png"),
+    ]
     
-    # Create image with text
-    create_image_with_text(test_data_dir / "images" / "image_with_text.png")
+    with ProcessPoolExecutor(max_workers=len(tasks)) as executor:
+        list(executor.map(_run_task, tasks))
     
     print("Test data created successfully!")
 
 
+def _run_task(task):
+    """Run a single (creator, output path) task in a worker process."""
+    create_fn, output_path = task
+    create_fn(output_path)
+
+
 def create_simple_table_pdf(output_path: Path):
     """Create a PDF with a simple table."""
-    doc = SimpleDocTemplate(str(output_path), pagesize=letter)
-    styles = getSampleStyleSheet()
+    # Render in memory and write the finished PDF in one call
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    styles = _STYLES
     story = []
     
     # Title
@@ -63,25 +109,19 @@ def create_simple_table_pdf(output_path: Path):
     
     # Create table
     table = Table(data)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 14),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
+    table.setStyle(_SIMPLE_TABLE_STYLE)
     
     story.append(table)
     doc.build(story)
+    output_path.write_bytes(buffer.getvalue())
 
 
 def create_nested_table_pdf(output_path: Path):
     """Create a PDF with nested tables."""
-    doc = SimpleDocTemplate(str(output_path), pagesize=letter)
-    styles = getSampleStyleSheet()
+    # Render in memory and write the finished PDF in one call
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    styles = _STYLES
     story = []
     
     # Title
@@ -98,16 +138,7 @@ def create_nested_table_pdf(output_path: Path):
     ]
     
     main_table = Table(main_data)
-    main_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
+    main_table.setStyle(_MAIN_TABLE_STYLE)
     
     story.append(main_table)
     story.append(Paragraph("<br/>", styles['Normal']))
@@ -121,27 +152,21 @@ def create_nested_table_pdf(output_path: Path):
     ]
     
     nested_table = Table(nested_data)
-    nested_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightblue),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.lightgrey),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
+    nested_table.setStyle(_NESTED_TABLE_STYLE)
     
     story.append(Paragraph("Nested Table Example:", styles['Heading2']))
     story.append(nested_table)
     
     doc.build(story)
+    output_path.write_bytes(buffer.getvalue())
 
 
 def create_text_pdf(output_path: Path):
     """Create a PDF with plain text content."""
-    doc = SimpleDocTemplate(str(output_path), pagesize=letter)
-    styles = getSampleStyleSheet()
+    # Render in memory and write the finished PDF in one call
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    styles = _STYLES
     story = []
     
     # Title
@@ -171,30 +196,36 @@ def create_text_pdf(output_path: Path):
     images with OCR, and structured documents with tables.
     """
     
-    paragraphs = text_content.strip().split('\n\n')
+    # Separate paragraphs with one shared spacer rather than an extra "<br/>" paragraph each
+    paragraphs = [para.strip() for para in text_content.strip().split('\n\n') if para.strip()]
+    spacer = Spacer(1, 12)
     for para in paragraphs:
-        if para.strip():
-            story.append(Paragraph(para.strip(), styles['Normal']))
-            story.append(Paragraph("<br/>", styles['Normal']))
+        story.append(Paragraph(para, styles['Normal']))
+        story.append(spacer)
     
     doc.build(story)
+    output_path.write_bytes(buffer.getvalue())
+
+
+@lru_cache(maxsize=8)
+def _load_font(size: int):
+    """Load Arial at the given size, falling back to PIL's default font."""
+    for font_path in ("/System/Library/Fonts/Arial.ttf", "arial.ttf"):
+        try:
+            return ImageFont.truetype(font_path, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
 
 
 def create_image_with_text(output_path: Path):
     """Create an image with text for OCR testing."""
     # Create image
     width, height = 800, 600
-    image = Image.new('RGB', (width, height), color='white')
+    image = Image.fromarray(np.full((height, width, 3), 255, dtype=np.uint8), 'RGB')
     draw = ImageDraw.Draw(image)
     
-    # Try to use a default font, fallback to basic if not available
-    try:
-        font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 24)
-    except:
-        try:
-            font = ImageFont.truetype("arial.ttf", 24)
-        except:
-            font = ImageFont.load_default()
+    font = _load_font(24)
     
     # Draw text
     text_lines = [
@@ -213,14 +244,14 @@ def create_image_with_text(output_path: Path):
         "and made searchable by the RAG system."
     ]
     
-    y_position = 50
-    for line in text_lines:
-        if line.strip():
-            draw.text((50, y_position), line, fill='black', font=font)
-        y_position += 30
+    # Lay out the whole block in one call instead of drawing line by line. Pillow
+    # advances each line by the height of "A" plus spacing; keep the 30px line pitch
+    line_pitch = 30
+    spacing = line_pitch - draw.textbbox((0, 0), "A", font=font)[3]
+    draw.multiline_text((50, 50), "\n".join(text_lines), fill='black', font=font, spacing=spacing, align='left')
     
-    # Save image
-    image.save(output_path, 'PNG')
+    # Save image (fast zlib level; this is a throwaway test asset)
+    image.save(output_path, 'PNG', optimize=False, compress_level=1)
     print(f"Created image: {output_path}")
 
 
@@ -17,9 +17,19 @@ import os
 import sys
 import json
 import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from requests_toolbelt import MultipartEncoder
 from pathlib import Path
 from dotenv import load_dotenv
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
 
 # Load environment variables from .env file
 load_dotenv()
@@ -29,6 +39,9 @@ BASE_URL = "http://localhost:8000"
 AUTH_TOKEN = os.getenv("API_AUTH_TOKEN", "InaqhBh3P0MaJCBQnxF05DsdpWjbESpLJvoa-2tfwxI")
 TEST_PDF_PATH = "test_data/post_pdf.pdf"
 
+# Lightweight record for each logged test result
+TestResult = namedtuple("TestResult", "test success message response")
+
 class APITester:
     """API testing class for Cymbal RAG API."""
     
@@ -36,48 +49,67 @@ class APITester:
         self.base_url = base_url
         self.auth_token = auth_token
         self.session = requests.Session()
+        self.session.headers["Connection"] = "keep-alive"
+        
+        # Requests merges session params into every call, so the token is set once here
+        self.session.params = {"token": self.auth_token}
+        
+        # Reuse pooled keep-alive connections across every test request
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        
+        # Bound session methods, so make_request skips the generic method dispatch
+        self._verbs = {"GET": self.session.get, "POST": self.session.post, "DELETE": self.session.delete}
         self.test_results = []
         
+        # Stat the test PDF once; every test reuses the result
+        self._pdf_stat = os.stat(TEST_PDF_PATH) if os.path.exists(TEST_PDF_PATH) else None
+        
     def log_test(self, test_name: str, success: bool, message: str = "", response_data: dict = None):
         """Log test result."""
         status = "✅ PASS" if success else "❌ FAIL"
         print(f"{status} {test_name}: {message}")
         
         if response_data and not success:
-            print(f"   Response: {json.dumps(response_data, indent=2)}")
-        
-        self.test_results.append({
-            "test": test_name,
-            "success": success,
-            "message": message,
-            "response": response_data
-        })
+            if ORJSON_AVAILABLE:
+                formatted = orjson.dumps(response_data, option=orjson.OPT_INDENT_2).decode()
+            else:
+                formatted = json.dumps(response_data, indent=2)
+            print(f"   Response: {formatted}")
+        
+        self.test_results.append(TestResult(test_name, success, message, response_data))
     
     def make_request(self, method: str, endpoint: str, **kwargs):
         """Make authenticated request to API."""
         url = f"{self.base_url}{endpoint}"
-        
-        # Add token to query parameters for GET requests
-        if method.upper() == "GET":
-            params = kwargs.get("params", {})
-            params["token"] = self.auth_token
-            kwargs["params"] = params
-        else:
-            # For POST requests, add token to query params
-            if "params" not in kwargs:
-                kwargs["params"] = {}
-            kwargs["params"]["token"] = self.auth_token
+        method = method.upper()
         
         # Set timeout based on operation type
-        timeout = 180 if method.upper() == "POST" and "upload" in endpoint else 60
+        timeout = 180 if method == "POST" and "upload" in endpoint else 60
         
+        # The body is not parsed here; callers use parse_json only when they need it
         try:
-            response = self.session.request(method, url, timeout=timeout, **kwargs)
-            return response, response.json() if response.content else {}
+            return self._verbs[method](url, timeout=timeout, **kwargs), None
         except requests.exceptions.RequestException as e:
             return None, {"error": str(e)}
-        except json.JSONDecodeError:
-            return None, {"error": "Invalid JSON response"}
+    
+    @staticmethod
+    def parse_json(response, error: dict = None):
+        """Parse a response body as JSON, or return the request error if there was no response."""
+        if response is None:
+            return error
+        if not response.content:
+            return {}
+        # Error pages from proxies or the server itself are often HTML or text; don't try to decode them
+        if not response.headers.get("Content-Type", "").startswith("application/json"):
+            return {"error": f"Non-JSON response with status {response.status_code}"}
+        try:
+            if ORJSON_AVAILABLE:
+                return orjson.loads(response.content)
+            return response.json()
+        except ValueError:
+            return {"error": "Invalid JSON response"}
     
     def test_health_endpoint(self):
         """Test health endpoint (should work without auth)."""
@@ -85,7 +117,7 @@ class APITester:
         print(f"   GET {self.base_url}/health")
         
         try:
-            response = requests.get(f"{self.base_url}/health", timeout=10)
+            response = self.session.get(f"{self.base_url}/health", timeout=10)
             if response.status_code == 200:
                 data = response.json()
                 self.log_test("Health Check", True, f"API is healthy - {data.get('status', 'unknown')}")
@@ -101,10 +133,27 @@ class APITester:
         """Test authentication by accessing protected endpoint."""
         print("\n🔐 Testing Authentication...")
         
+        list_url = f"{self.base_url}/api/v1/files/list"
+        print(f"   HEAD {list_url} (no token)")
+        print(f"   HEAD {list_url}?token=invalid-token")
+        print(f"   GET {list_url}?token={self.auth_token}")
+        
+        # The three checks are independent, so fire them concurrently and
+        # report the results in order. The rejection checks only need the
+        # status code, and the auth middleware answers HEAD with the same 401.
+        # Both override the session-level token: a None value drops it entirely.
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            no_token = executor.submit(
+                self.session.head, list_url, params={"token": None}, timeout=10, allow_redirects=False
+            )
+            invalid_token = executor.submit(
+                self.session.head, list_url, params={"token": "invalid-token"}, timeout=10, allow_redirects=False
+            )
+            valid_token = executor.submit(self.make_request, "GET", "/api/v1/files/list")
+        
         # Test without token (should fail)
-        print(f"   GET {self.base_url}/api/v1/files/list (no token)")
         try:
-            response = requests.get(f"{self.base_url}/api/v1/files/list", timeout=10)
+            response = no_token.result()
             if response.status_code == 401:
                 self.log_test("Auth - No Token", True, "Correctly rejected request without token")
             else:
@@ -113,9 +162,8 @@ class APITester:
             self.log_test("Auth - No Token", False, f"Request failed: {str(e)}")
         
         # Test with invalid token (should fail)
-        print(f"   GET {self.base_url}/api/v1/files/list?token=invalid-token")
         try:
-            response = requests.get(f"{self.base_url}/api/v1/files/list?token=invalid-token", timeout=10)
+            response = invalid_token.result()
             if response.status_code == 401:
                 self.log_test("Auth - Invalid Token", True, "Correctly rejected invalid token")
             else:
@@ -124,13 +172,12 @@ class APITester:
             self.log_test("Auth - Invalid Token", False, f"Request failed: {str(e)}")
         
         # Test with valid token (should succeed)
-        print(f"   GET {self.base_url}/api/v1/files/list?token={self.auth_token}")
-        response, data = self.make_request("GET", "/api/v1/files/list")
+        response, error = valid_token.result()
         if response and response.status_code == 200:
             self.log_test("Auth - Valid Token", True, "Successfully authenticated with valid token")
             return True
         else:
-            self.log_test("Auth - Valid Token", False, f"Authentication failed: {data}")
+            self.log_test("Auth - Valid Token", False, f"Authentication failed: {self.parse_json(response, error)}")
             return False
     
     def test_file_validation(self):
@@ -138,13 +185,17 @@ class APITester:
         print("\n📄 Testing File Validation...")
         print(f"   POST {self.base_url}/api/v1/file/validate?token={self.auth_token}")
         
-        if not os.path.exists(TEST_PDF_PATH):
+        if self._pdf_stat is None:
             self.log_test("File Validation", False, f"Test file not found: {TEST_PDF_PATH}")
             return False
         
         with open(TEST_PDF_PATH, "rb") as f:
-            files = {"file": ("post_pdf.pdf", f, "application/pdf")}
-            response, data = self.make_request("POST", "/api/v1/file/validate", files=files)
+            # Stream the multipart body instead of buffering the file in memory
+            encoder = MultipartEncoder(fields={"file": ("post_pdf.pdf", f, "application/pdf")})
+            response, error = self.make_request(
+                "POST", "/api/v1/file/validate", data=encoder, headers={"Content-Type": encoder.content_type}
+            )
+        data = self.parse_json(response, error)
         
         if response and response.status_code == 200 and data.get("success"):
             self.log_test("File Validation", True, f"File validated successfully - {data.get('content_analysis', {}).get('content_quality', {}).get('score', 'N/A')}/10")
@@ -159,18 +210,24 @@ class APITester:
         print(f"   POST {self.base_url}/api/v1/upload/direct?token={self.auth_token}")
         print(f"   File: {os.path.abspath(TEST_PDF_PATH)}")
         
-        if not os.path.exists(TEST_PDF_PATH):
+        if self._pdf_stat is None:
             self.log_test("File Upload", False, f"Test file not found: {TEST_PDF_PATH}")
             return False
         
         # Verify file exists and get its size
-        file_size = os.path.getsize(TEST_PDF_PATH)
+        file_size = self._pdf_stat.st_size
         print(f"   File size: {file_size} bytes")
         
         with open(TEST_PDF_PATH, "rb") as f:
-            files = {"file": ("post_pdf.pdf", f, "application/pdf")}
-            data = {"tags": "test,api,verification"}
-            response, result = self.make_request("POST", "/api/v1/upload/direct", files=files, data=data)
+            # Stream the multipart body instead of buffering the file in memory
+            encoder = MultipartEncoder(fields={
+                "file": ("post_pdf.pdf", f, "application/pdf"),
+                "tags": "test,api,verification"
+            })
+            response, error = self.make_request(
+                "POST", "/api/v1/upload/direct", data=encoder, headers={"Content-Type": encoder.content_type}
+            )
+        result = self.parse_json(response, error)
         
         if response and response.status_code == 200 and result.get("success"):
             self.log_test("File Upload", True, f"File uploaded successfully - {result.get('chunks_created', 0)} chunks created")
@@ -184,7 +241,8 @@ class APITester:
         print("\n📋 Testing File List...")
         print(f"   GET {self.base_url}/api/v1/files/list?token={self.auth_token}")
         
-        response, data = self.make_request("GET", "/api/v1/files/list")
+        response, error = self.make_request("GET", "/api/v1/files/list")
+        data = self.parse_json(response, error)
         
         if response and response.status_code == 200 and data.get("success"):
             files = data.get("files", [])
@@ -216,7 +274,8 @@ class APITester:
         print(f"   Query: {search_query}")
         print(f"   Parameters: ktop=3, threshold=0.5")
         
-        response, data = self.make_request("POST", "/api/v1/search/rag", json=search_data)
+        response, error = self.make_request("POST", "/api/v1/search/rag", json=search_data)
+        data = self.parse_json(response, error)
         
         if response and response.status_code == 200 and data.get("success"):
             files_found = len(data.get("files", []))
@@ -240,7 +299,8 @@ class APITester:
         print(f"   DELETE {self.base_url}/api/v1/upload/delete?filename=post_pdf.pdf")
         
         # Try to delete the test file
-        response, data = self.make_request("DELETE", "/api/v1/upload/delete", params={"filename": "post_pdf.pdf"})
+        response, error = self.make_request("DELETE", "/api/v1/upload/delete", params={"filename": "post_pdf.pdf"})
+        data = self.parse_json(response, error)
         
         if response and response.status_code == 200 and data.get("success"):
             self.log_test("File Delete", True, "Test file deleted successfully")
@@ -254,7 +314,8 @@ class APITester:
         print("\n📋 Testing Supported Formats...")
         print(f"   GET {self.base_url}/api/v1/file/supported-formats?token={self.auth_token}")
         
-        response, data = self.make_request("GET", "/api/v1/file/supported-formats")
+        response, error = self.make_request("GET", "/api/v1/file/supported-formats")
+        data = self.parse_json(response, error)
         
         if response and response.status_code == 200 and "supported_formats" in data:
             formats = data.get("supported_formats", {})
@@ -319,13 +380,15 @@ def main():
         print("❌ Error: .env file not found. Please create one with API_AUTH_TOKEN.")
         sys.exit(1)
     
+    # Create tester
+    tester = APITester(BASE_URL, AUTH_TOKEN)
+    
     # Check if test PDF exists
-    if not os.path.exists(TEST_PDF_PATH):
+    if tester._pdf_stat is None:
         print(f"❌ Error: Test PDF not found at {TEST_PDF_PATH}")
         sys.exit(1)
     
-    # Create tester and run tests
-    tester = APITester(BASE_URL, AUTH_TOKEN)
+    # Run tests
     success = tester.run_all_tests()
     
     # Exit with appropriate code
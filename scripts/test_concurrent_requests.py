@@ -8,14 +8,29 @@ can handle them without blocking.
 
 import asyncio
 import aiohttp
+import json
 import time
 import os
 from dotenv import load_dotenv
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    uvloop = None
+    UVLOOP_AVAILABLE = False
 
 # Load environment variables
 load_dotenv()
 
 BASE_URL = "http://localhost:8000"
+# Decode responses with orjson when it is installed
+JSON_LOADS = orjson.loads if ORJSON_AVAILABLE else json.loads
 AUTH_TOKEN = os.getenv("API_AUTH_TOKEN", "InaqhBh3P0MaJCBQnxF05DsdpWjbESpLJvoa-2tfwxI")
 
 async def make_request(session, endpoint, method="GET", data=None):
@@ -26,11 +41,11 @@ async def make_request(session, endpoint, method="GET", data=None):
     try:
         if method == "GET":
             async with session.get(url) as response:
-                result = await response.json()
+                result = await response.json(loads=JSON_LOADS)
                 status = response.status
         else:
             async with session.post(url, json=data) as response:
-                result = await response.json()
+                result = await response.json(loads=JSON_LOADS)
                 status = response.status
         
         duration = time.time() - start_time
@@ -70,8 +85,18 @@ async def test_concurrent_requests():
         "threshold": 0.5
     }
     
-    # Create session
-    async with aiohttp.ClientSession() as session:
+    # Create one session with a tuned connector so sockets and DNS lookups are reused
+    connector = aiohttp.TCPConnector(
+        limit=0,
+        limit_per_host=64,
+        keepalive_timeout=30,
+        ttl_dns_cache=300,
+        enable_cleanup_closed=True
+    )
+    timeout = aiohttp.ClientTimeout(total=30, connect=5)
+    async with aiohttp.ClientSession(
+        connector=connector, timeout=timeout, headers={"Connection": "keep-alive"}
+    ) as session:
         # Test 1: Multiple health checks (should be fast)
         print("\n🔍 Test 1: Multiple Health Checks (5 concurrent)")
         health_tasks = [make_request(session, "/health") for _ in range(5)]
@@ -143,6 +168,10 @@ def main():
     print("Usage: ./start_server.sh 8000 4  # 4 workers")
     print()
     
+    # Use the libuv-backed event loop when available (not supported on Windows)
+    if UVLOOP_AVAILABLE:
+        uvloop.install()
+    
     try:
         success = asyncio.run(test_concurrent_requests())
         exit(0 if success else 1)
@@ -8,14 +8,22 @@ an optimal threshold value.
 """
 
 import os
-import requests
+import argparse
+import atexit
+import hashlib
+import httpx
 import json
 import time
-from typing import List, Dict, Any
-import statistics
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
-import matplotlib.pyplot as plt
 import numpy as np
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
 
 # Load environment variables from .env file
 load_dotenv()
@@ -50,6 +58,30 @@ TEST_QUERIES = {
         "How to learn Spanish?"
     ]
 }
+# Leaf node fractions swept to trade vector search recall against latency
+LEAF_NODE_FRACTIONS = (0.05, 0.1, 0.2, 0.4)
+# Query embeddings cached between runs so threshold tuning skips re-embedding
+EMBEDDING_CACHE_PATH = "test_results/.embed_cache.npz"
+
+# Persistent client so every request reuses pooled keep-alive connections
+SESSION = httpx.Client(
+    base_url=API_BASE_URL,
+    params={"token": API_AUTH_TOKEN},
+    timeout=30.0,
+    limits=httpx.Limits(max_keepalive_connections=16, max_connections=32),
+    headers={"Connection": "keep-alive"}
+)
+atexit.register(SESSION.close)
+
+def parse_json(response: httpx.Response) -> Any:
+    """Decode a JSON response body, using orjson when it is installed.
+    
+    Non-JSON bodies raise httpx.DecodingError so the callers' httpx.HTTPError handlers catch them.
+    """
+    try:
+        return orjson.loads(response.content) if ORJSON_AVAILABLE else response.json()
+    except ValueError as e:
+        raise httpx.DecodingError(f"Invalid JSON in response: {e}", request=response.request) from e
 
 def upload_test_file() -> bool:
     """Upload the test file to the system."""
@@ -59,15 +91,13 @@ def upload_test_file() -> bool:
         print(f"❌ Test file not found: {TEST_FILE_PATH}")
         return False
     
-    url = f"{API_BASE_URL}/upload/direct?token={API_AUTH_TOKEN}"
-    
     try:
         with open(TEST_FILE_PATH, 'rb') as f:
             files = {'file': f}
             data = {'replace_existing': 'true', 'tags': 'test,product,catalog'}
-            response = requests.post(url, files=files, data=data, timeout=60)
+            response = SESSION.post("/upload/direct", files=files, data=data, timeout=60)
             response.raise_for_status()
-            result = response.json()
+            result = parse_json(response)
             
             if result.get("success"):
                 print(f"✅ File uploaded successfully: {result.get('filename')}")
@@ -77,22 +107,34 @@ def upload_test_file() -> bool:
                 print(f"❌ Upload failed: {result.get('message', 'Unknown error')}")
                 return False
                 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"❌ Error uploading file: {e}")
         return False
 
+def wait_for_file_ready(filename: str, delays=(0.1, 0.2, 0.4, 0.8, 1.6)) -> bool:
+    """Poll the upload status with exponential backoff until the file's embeddings are searchable."""
+    for delay in delays:
+        try:
+            response = SESSION.get(f"/upload/status/{filename}")
+            response.raise_for_status()
+            if parse_json(response).get("ready"):
+                return True
+        except httpx.HTTPError as e:
+            print(f"⚠️  Error checking file status: {e}")
+        time.sleep(delay)
+    return False
+
 def cleanup_test_file() -> bool:
     """Delete the test file from the system."""
     print(f"🗑️  Cleaning up test file...")
     
     filename = os.path.basename(TEST_FILE_PATH)
-    url = f"{API_BASE_URL}/upload/delete?token={API_AUTH_TOKEN}"
     params = {'filename': filename}
     
     try:
-        response = requests.delete(url, params=params, timeout=30)
+        response = SESSION.delete("/upload/delete", params=params)
         response.raise_for_status()
-        result = response.json()
+        result = parse_json(response)
         
         if result.get("success"):
             print(f"✅ File deleted successfully: {filename}")
@@ -101,26 +143,88 @@ def cleanup_test_file() -> bool:
             print(f"❌ Delete failed: {result.get('message', 'Unknown error')}")
             return False
             
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"❌ Error deleting file: {e}")
         return False
 
-def make_rag_request(query: str, ktop: int = 10, threshold: float = 0.8) -> Dict[str, Any]:
-    """Make a RAG search request to the API."""
-    url = f"{API_BASE_URL}/search/rag?token={API_AUTH_TOKEN}"
+def load_embedding_cache(cache_path: str) -> Tuple[Optional[str], Dict[str, np.ndarray]]:
+    """Load cached query embeddings keyed by query hash, with the model that produced them."""
+    if not Path(cache_path).exists():
+        return None, {}
+    with np.load(cache_path) as data:
+        model = str(data["__model__"]) if "__model__" in data.files else None
+        return model, {key: data[key] for key in data.files if key != "__model__"}
+
+def save_embedding_cache(cache_path: str, model: Optional[str], cache: Dict[str, np.ndarray]):
+    """Save query embeddings and their model id as a compressed .npz file."""
+    if model is None or not cache:
+        return
+    Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(cache_path, __model__=np.array(model), **cache)
+
+def get_query_embeddings(
+    queries: List[str], cache_model: Optional[str], cache: Dict[str, np.ndarray]
+) -> Tuple[Optional[str], Optional[List[List[float]]]]:
+    """Return (model, embeddings) for the queries, embedding only those missing from the cache."""
+    keys = [hashlib.sha1(query.encode("utf-8")).hexdigest() for query in queries]
+    
+    try:
+        # Check the server's current model on every run; the probe does not embed anything
+        response = SESSION.get("/search/embed")
+        response.raise_for_status()
+        model = parse_json(response)["model"]
+        if cache_model is not None and model != cache_model:
+            # The server switched embedding models, so none of the cached vectors are valid
+            print(f"♻️  Embedding model changed ({cache_model} → {model}), discarding cached embeddings")
+            cache.clear()
+        
+        missing = [query for query, key in zip(queries, keys) if key not in cache]
+        if missing:
+            response = SESSION.post("/search/embed", json={"queries": missing}, timeout=120)
+            response.raise_for_status()
+            data = parse_json(response)
+            model = data["model"]
+            for query, embedding in zip(missing, data["embeddings"]):
+                cache[hashlib.sha1(query.encode("utf-8")).hexdigest()] = np.asarray(embedding, dtype=np.float32)
+    except httpx.HTTPError as e:
+        print(f"⚠️  Could not fetch query embeddings, the server will embed the queries: {e}")
+        return None, None
+    
+    print(f"🧠 Query embeddings: {len(queries) - len(missing)} cached, {len(missing)} fetched")
+    return model, [cache[key].tolist() for key in keys]
+
+def make_batch_rag_request(
+    queries: List[str],
+    ktop: int = 10,
+    threshold: float = 0.8,
+    fraction_leaf_nodes_to_search: float = None,
+    embeddings: List[List[float]] = None,
+    embedding_model: str = None
+) -> Tuple[List[Dict[str, Any]], Optional[float]]:
+    """Run several RAG searches in one request.
+    
+    Returns one result (or None) per query, in order, plus the server-side
+    vector search time in milliseconds (None if unavailable).
+    """
     payload = {
-        "query": query,
+        "queries": queries,
         "ktop": ktop,
         "threshold": threshold
     }
+    if fraction_leaf_nodes_to_search is not None:
+        payload["fraction_leaf_nodes_to_search"] = fraction_leaf_nodes_to_search
+    if embeddings is not None:
+        payload["embeddings"] = embeddings
+        payload["embedding_model"] = embedding_model
     
     try:
-        response = requests.post(url, json=payload, timeout=30)
+        response = SESSION.post("/search/rag/batch", json=payload, timeout=300)
         response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Error making request for query '{query}': {e}")
-        return None
+        data = parse_json(response)
+        return data["results"], data.get("vector_search_ms")
+    except httpx.HTTPError as e:
+        print(f"❌ Error making batch request for {len(queries)} queries: {e}")
+        return [None] * len(queries), None
 
 def analyze_search_results(results: Dict[str, Any], query: str, query_type: str) -> Dict[str, Any]:
     """Analyze search results and extract metrics."""
@@ -137,16 +241,16 @@ def analyze_search_results(results: Dict[str, Any], query: str, query_type: str)
             "has_content": False
         }
     
-    chunks = []
+    # Collect distances and check for content in a single pass over the chunks
+    distances = []
+    has_content = False
     for file_info in results.get("files", []):
         for chunk in file_info.get("matched_chunks", []):
-            chunks.append({
-                "distance": chunk.get("distance", 1.0),
-                "content": chunk.get("content", ""),
-                "filename": chunk.get("filename", "")
-            })
+            distances.append(chunk.get("distance", 1.0))
+            if not has_content and chunk.get("content", "").strip():
+                has_content = True
     
-    if not chunks:
+    if not distances:
         return {
             "query": query,
             "type": query_type,
@@ -159,26 +263,44 @@ def analyze_search_results(results: Dict[str, Any], query: str, query_type: str)
             "has_content": False
         }
     
-    distances = [chunk["distance"] for chunk in chunks]
-    distances.sort()  # Sort to get top (lowest) distance first
+    # Scores are higher-is-better (threshold uses >=, rerank sorts descending)
+    top_distance = max(distances)
     
     return {
         "query": query,
         "type": query_type,
         "success": True,
-        "total_chunks": len(chunks),
+        "total_chunks": len(distances),
         "total_files": results.get("total_files", 0),
-        "top_distance": distances[0],  # Top (best) distance
+        "top_distance": top_distance,  # Top (best) distance
         "min_distance": min(distances),
-        "max_distance": max(distances),
-        "has_content": any(len(chunk["content"].strip()) > 0 for chunk in chunks),
+        "max_distance": top_distance,
+        "has_content": has_content,
         "distances": distances
     }
 
 # Removed threshold sensitivity testing as we focus on top results
 
-def create_distance_plot(related_distances: List[float], unrelated_distances: List[float], save_path: str = "test_results/distance_distribution.png"):
+def summarize_distances(distances: List[float]) -> Dict[str, float]:
+    """Compute mean, sample standard deviation, min and max of a distance series in one pass."""
+    values = np.asarray(distances, dtype=np.float64)
+    return {
+        "mean": float(values.mean()),
+        "std": float(values.std(ddof=1)) if len(values) > 1 else 0.0,
+        "min": float(values.min()),
+        "max": float(values.max())
+    }
+
+def create_distance_plot(
+    related_distances: List[float],
+    unrelated_distances: List[float],
+    save_path: str = "test_results/distance_distribution.png",
+    related_stats: Dict[str, float] = None,
+    unrelated_stats: Dict[str, float] = None
+):
     """Create a plot showing the distribution of distances for related vs unrelated queries."""
+    import matplotlib.pyplot as plt  # Imported lazily; only needed with --plot
+    
     print(f"\n📊 Creating distance distribution plot...")
     
     # Set up the plot
@@ -187,9 +309,10 @@ def create_distance_plot(related_distances: List[float], unrelated_distances: Li
     # Create subplots
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
     
-    # Plot 1: Histogram comparison
-    ax1.hist(related_distances, bins=20, alpha=0.7, label='Related Queries', color='green', edgecolor='black')
-    ax1.hist(unrelated_distances, bins=20, alpha=0.7, label='Unrelated Queries', color='red', edgecolor='black')
+    # Plot 1: Histogram comparison (shared bin edges so the two series line up)
+    edges = np.histogram_bin_edges(related_distances + unrelated_distances, bins=20)
+    ax1.hist(related_distances, bins=edges, alpha=0.7, label='Related Queries', color='green', edgecolor='black')
+    ax1.hist(unrelated_distances, bins=edges, alpha=0.7, label='Unrelated Queries', color='red', edgecolor='black')
     ax1.set_xlabel('Distance Score')
     ax1.set_ylabel('Frequency')
     ax1.set_title('Distance Distribution: Related vs Unrelated Queries')
@@ -206,11 +329,11 @@ def create_distance_plot(related_distances: List[float], unrelated_distances: Li
     ax2.set_title('Distance Score Distribution (Box Plot)')
     ax2.grid(True, alpha=0.3)
     
-    # Add statistics text
-    related_mean = statistics.mean(related_distances)
-    unrelated_mean = statistics.mean(unrelated_distances)
-    related_std = statistics.stdev(related_distances)
-    unrelated_std = statistics.stdev(unrelated_distances)
+    # Add statistics text (reuse the caller's statistics when provided)
+    related_stats = related_stats or summarize_distances(related_distances)
+    unrelated_stats = unrelated_stats or summarize_distances(unrelated_distances)
+    related_mean, related_std = related_stats["mean"], related_stats["std"]
+    unrelated_mean, unrelated_std = unrelated_stats["mean"], unrelated_stats["std"]
     
     stats_text = f"""Statistics:
 Related Queries: μ={related_mean:.3f}, σ={related_std:.3f}
@@ -234,31 +357,16 @@ def create_ascii_plot(related_distances: List[float], unrelated_distances: List[
     print(f"\n📊 ASCII Distance Distribution:")
     print("=" * 60)
     
-    # Create bins
+    # Bin both series over the same range in one vectorized pass each
     all_distances = related_distances + unrelated_distances
-    min_dist = min(all_distances)
-    max_dist = max(all_distances)
-    bin_size = (max_dist - min_dist) / 20
-    
-    # Count frequencies
-    related_bins = [0] * 20
-    unrelated_bins = [0] * 20
-    
-    for dist in related_distances:
-        bin_idx = min(int((dist - min_dist) / bin_size), 19)
-        related_bins[bin_idx] += 1
+    hist_range = (min(all_distances), max(all_distances))
+    related_bins, edges = np.histogram(related_distances, bins=20, range=hist_range)
+    unrelated_bins, _ = np.histogram(unrelated_distances, bins=20, range=hist_range)
     
-    for dist in unrelated_distances:
-        bin_idx = min(int((dist - min_dist) / bin_size), 19)
-        unrelated_bins[bin_idx] += 1
-    
-    max_freq = max(max(related_bins), max(unrelated_bins))
+    max_freq = max(related_bins.max(), unrelated_bins.max())
     
     # Print ASCII histogram
-    for i in range(20):
-        bin_start = min_dist + i * bin_size
-        bin_end = min_dist + (i + 1) * bin_size
-        
+    for i, (bin_start, bin_end) in enumerate(zip(edges[:-1], edges[1:])):
         related_bar = "█" * int(related_bins[i] * 30 / max_freq)
         unrelated_bar = "▓" * int(unrelated_bins[i] * 30 / max_freq)
         
@@ -267,8 +375,91 @@ def create_ascii_plot(related_distances: List[float], unrelated_distances: List[
     print("Legend: █ = Related Queries, ▓ = Unrelated Queries")
     print("=" * 60)
 
-def run_comprehensive_evaluation():
-    """Run comprehensive evaluation of the vector search system."""
+def run_leaf_node_sweep(
+    ktop: int, threshold: float, embeddings: List[List[float]] = None, embedding_model: str = None
+) -> List[Dict[str, Any]]:
+    """Measure vector search latency and related/unrelated separation for each leaf node fraction.
+    
+    Latency is the server-reported vector search time, so reranking and answer
+    generation do not drown out the differences between fractions.
+    """
+    print(f"\n🔬 Leaf Node Fraction Sweep")
+    print("-" * 60)
+    
+    queries = TEST_QUERIES["related"] + TEST_QUERIES["unrelated"]
+    related_count = len(TEST_QUERIES["related"])
+    sweep = []
+    for fraction in LEAF_NODE_FRACTIONS:
+        batch_results, latency_ms = make_batch_rag_request(
+            queries, ktop=ktop, threshold=threshold, fraction_leaf_nodes_to_search=fraction,
+            embeddings=embeddings, embedding_model=embedding_model
+        )
+        
+        top_distances = [
+            analyze_search_results(response, query, "sweep")["top_distance"]
+            for query, response in zip(queries, batch_results)
+        ]
+        related = [d for d in top_distances[:related_count] if d is not None]
+        unrelated = [d for d in top_distances[related_count:] if d is not None]
+        gap = float(abs(np.mean(related) - np.mean(unrelated))) if related and unrelated else None
+        
+        sweep.append({"fraction": fraction, "latency_ms": latency_ms, "mean_gap": gap})
+        gap_text = f"{gap:.3f}" if gap is not None else "n/a"
+        latency_text = f"{latency_ms:8.1f}ms" if latency_ms is not None else "     n/a"
+        print(f"  fraction={fraction:<5} vector search={latency_text}  mean gap={gap_text}")
+    
+    # Recommend the cheapest setting whose separation is within 0.01 of the best one
+    gaps = [row["mean_gap"] for row in sweep if row["mean_gap"] is not None]
+    if gaps:
+        best_gap = max(gaps)
+        recommended = next(
+            row for row in sweep if row["mean_gap"] is not None and row["mean_gap"] >= best_gap - 0.01
+        )
+        print(f"  Recommended leaf node fraction: {recommended['fraction']}")
+    
+    return sweep
+
+def create_sweep_plot(sweep: List[Dict[str, Any]], save_path: str = "test_results/leaf_node_sweep.png"):
+    """Plot vector search latency against related/unrelated separation for each leaf node fraction."""
+    rows = [row for row in sweep if row["mean_gap"] is not None and row["latency_ms"] is not None]
+    if not rows:
+        return None
+    
+    import matplotlib.pyplot as plt  # Imported lazily; only needed with --plot
+    
+    fig, ax = plt.subplots(figsize=(8, 6))
+    ax.plot([row["latency_ms"] for row in rows], [row["mean_gap"] for row in rows], marker='o')
+    for row in rows:
+        ax.annotate(f"{row['fraction']}", (row["latency_ms"], row["mean_gap"]),
+                    textcoords="offset points", xytext=(5, 5))
+    ax.set_xlabel('Vector Search Latency (ms)')
+    ax.set_ylabel('Mean Top Distance Gap (related vs unrelated)')
+    ax.set_title('Leaf Node Fraction: Latency vs Separation')
+    ax.grid(True, alpha=0.3)
+    
+    plt.tight_layout()
+    plt.savefig(save_path, dpi=150, bbox_inches='tight')
+    plt.close(fig)
+    print(f"📊 Sweep plot saved as: {save_path}")
+    return save_path
+
+def save_results_json(payload: Dict[str, Any], save_path: str):
+    """Write evaluation results as indented JSON, using orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        data = orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    else:
+        data = json.dumps(payload, indent=2).encode("utf-8")
+    Path(save_path).write_bytes(data)
+
+def run_comprehensive_evaluation(save_json: bool = False, plot: bool = False, full: bool = False, sweep: bool = False):
+    """Run comprehensive evaluation of the vector search system.
+    
+    Args:
+        save_json: Write detailed results to test_results/vector_search_evaluation_results.json
+        plot: Save the distance distribution plot to test_results/distance_distribution.png
+        full: Fetch the top 10 chunks per query instead of only the best match
+        sweep: Also measure latency and separation for each leaf node fraction in LEAF_NODE_FRACTIONS
+    """
     print("🚀 Starting Vector Search Evaluation")
     print("=" * 60)
     
@@ -278,73 +469,85 @@ def run_comprehensive_evaluation():
         return
     
     print("\n⏳ Waiting for file processing...")
-    time.sleep(3)  # Give time for processing
+    if wait_for_file_ready(os.path.basename(TEST_FILE_PATH)):
+        print("✅ File embeddings are searchable")
+    else:
+        print("⚠️  File not reported ready yet, continuing anyway")
     
     all_results = {
         "related": [],
         "unrelated": []
     }
     
-    # Test related queries
-    print("\n📊 Testing Related Queries")
-    print("-" * 40)
-    for query in TEST_QUERIES["related"]:
-        print(f"\n🔍 Testing: '{query}'")
-        response = make_rag_request(query, ktop=10, threshold=0.3)
-        analysis = analyze_search_results(response, query, "related")
-        all_results["related"].append(analysis)
-        
-        if analysis["success"] and analysis["top_distance"] is not None:
-            print(f"  ✅ Query: '{query}' → Distance: {analysis['top_distance']:.3f} (Chunks: {analysis['total_chunks']})")
-        else:
-            print(f"  ❌ Query: '{query}' → Failed")
-        
-        time.sleep(0.5)
-    
-    # Test unrelated queries
-    print("\n📊 Testing Unrelated Queries")
-    print("-" * 40)
-    for query in TEST_QUERIES["unrelated"]:
-        print(f"\n🔍 Testing: '{query}'")
-        response = make_rag_request(query, ktop=10, threshold=0.3)
-        analysis = analyze_search_results(response, query, "unrelated")
-        all_results["unrelated"].append(analysis)
-        
-        if analysis["success"] and analysis["top_distance"] is not None:
-            print(f"  ✅ Query: '{query}' → Distance: {analysis['top_distance']:.3f} (Chunks: {analysis['total_chunks']})")
-        else:
-            print(f"  ❌ Query: '{query}' → Failed")
-        
-        time.sleep(0.5)
+    # Only the top distance is needed for the threshold recommendation, so fetch a
+    # single chunk per query unless the full result set was requested
+    ktop = 10 if full else 1
+    
+    # Send every query in one batched request, then split the results back by type
+    query_types = ("related", "unrelated")
+    queries = [query for query_type in query_types for query in TEST_QUERIES[query_type]]
+    
+    # Reuse query embeddings from previous runs and only embed new queries
+    cache_model, embedding_cache = load_embedding_cache(EMBEDDING_CACHE_PATH)
+    embedding_model, embeddings = get_query_embeddings(queries, cache_model, embedding_cache)
+    save_embedding_cache(EMBEDDING_CACHE_PATH, embedding_model, embedding_cache)
+    
+    batch_results, _ = make_batch_rag_request(
+        queries, ktop=ktop, threshold=0.3, embeddings=embeddings, embedding_model=embedding_model
+    )
+    responses = {}
+    offset = 0
+    for query_type in query_types:
+        count = len(TEST_QUERIES[query_type])
+        responses[query_type] = batch_results[offset:offset + count]
+        offset += count
+    
+    for query_type in query_types:
+        print(f"\n📊 Testing {query_type.capitalize()} Queries")
+        print("-" * 40)
+        for query, response in zip(TEST_QUERIES[query_type], responses[query_type]):
+            print(f"\n🔍 Testing: '{query}'")
+            analysis = analyze_search_results(response, query, query_type)
+            all_results[query_type].append(analysis)
+            
+            if analysis["success"] and analysis["top_distance"] is not None:
+                print(f"  ✅ Query: '{query}' → Distance: {analysis['top_distance']:.3f} (Chunks: {analysis['total_chunks']})")
+            else:
+                print(f"  ❌ Query: '{query}' → Failed")
     
     # Analyze results
     print("\n📈 Analysis Results")
     print("=" * 60)
     
-    # Related queries analysis
+    # Collect each series once and compute its statistics in a single pass
     related_results = [r for r in all_results["related"] if r["success"] and r["top_distance"] is not None]
-    if related_results:
-        related_distances = [r["top_distance"] for r in related_results]
+    unrelated_results = [r for r in all_results["unrelated"] if r["success"] and r["top_distance"] is not None]
+    related_distances = [r["top_distance"] for r in related_results]
+    unrelated_distances = [r["top_distance"] for r in unrelated_results]
+    related_stats = summarize_distances(related_distances) if related_distances else None
+    unrelated_stats = summarize_distances(unrelated_distances) if unrelated_distances else None
+    optimal_threshold = None
+    
+    # Related queries analysis
+    if related_stats:
         print(f"\n✅ Related Queries ({len(related_results)} successful):")
-        print(f"  Average Top Distance: {statistics.mean(related_distances):.3f}")
-        print(f"  Min Top Distance: {min(related_distances):.3f}")
-        print(f"  Max Top Distance: {max(related_distances):.3f}")
-        print(f"  Std Deviation: {statistics.stdev(related_distances):.3f}")
+        print(f"  Average Top Distance: {related_stats['mean']:.3f}")
+        print(f"  Min Top Distance: {related_stats['min']:.3f}")
+        print(f"  Max Top Distance: {related_stats['max']:.3f}")
+        print(f"  Std Deviation: {related_stats['std']:.3f}")
     
     # Unrelated queries analysis
-    unrelated_results = [r for r in all_results["unrelated"] if r["success"] and r["top_distance"] is not None]
-    if unrelated_results:
-        unrelated_distances = [r["top_distance"] for r in unrelated_results]
+    if unrelated_stats:
         print(f"\n❌ Unrelated Queries ({len(unrelated_results)} successful):")
-        print(f"  Average Top Distance: {statistics.mean(unrelated_distances):.3f}")
-        print(f"  Min Top Distance: {min(unrelated_distances):.3f}")
-        print(f"  Max Top Distance: {max(unrelated_distances):.3f}")
-        print(f"  Std Deviation: {statistics.stdev(unrelated_distances):.3f}")
-    
-    # Threshold recommendation
-    if related_results and unrelated_results:
-        related_avg = statistics.mean(related_distances)
-        unrelated_avg = statistics.mean(unrelated_distances)
+        print(f"  Average Top Distance: {unrelated_stats['mean']:.3f}")
+        print(f"  Min Top Distance: {unrelated_stats['min']:.3f}")
+        print(f"  Max Top Distance: {unrelated_stats['max']:.3f}")
+        print(f"  Std Deviation: {unrelated_stats['std']:.3f}")
+    
+    if related_stats and unrelated_stats:
+        # Threshold recommendation
+        related_avg = related_stats["mean"]
+        unrelated_avg = unrelated_stats["mean"]
         
         # Calculate optimal threshold (midpoint with some buffer)
         optimal_threshold = (related_avg + unrelated_avg) / 2
@@ -354,28 +557,39 @@ def run_comprehensive_evaluation():
         print(f"  Unrelated queries avg top distance: {unrelated_avg:.3f}")
         print(f"  Recommended threshold: {optimal_threshold:.3f}")
         print(f"  Suggested range: {optimal_threshold - 0.1:.3f} - {optimal_threshold + 0.1:.3f}")
-    
-    # Create distance distribution plots
-    if related_results and unrelated_results:
-        related_distances = [r["top_distance"] for r in related_results if r["top_distance"] is not None]
-        unrelated_distances = [r["top_distance"] for r in unrelated_results if r["top_distance"] is not None]
         
-        if related_distances and unrelated_distances:
-            create_distance_plot(related_distances, unrelated_distances, "test_results/distance_distribution.png")
+        # Create distance distribution plots
+        if plot:
+            create_distance_plot(
+                related_distances, unrelated_distances, "test_results/distance_distribution.png",
+                related_stats=related_stats, unrelated_stats=unrelated_stats
+            )
+        else:
+            create_ascii_plot(related_distances, unrelated_distances)
+    
+    # Sweep the vector search recall/latency knob
+    sweep_results = None
+    if sweep:
+        sweep_results = run_leaf_node_sweep(
+            ktop=ktop, threshold=0.3, embeddings=embeddings, embedding_model=embedding_model
+        )
+        if plot:
+            create_sweep_plot(sweep_results, "test_results/leaf_node_sweep.png")
     
     # Save detailed results
-    with open("test_results/vector_search_evaluation_results.json", "w") as f:
-        json.dump({
+    if save_json:
+        save_results_json({
             "timestamp": time.time(),
             "all_results": all_results,
             "analysis": {
-                "related_distances": related_distances if 'related_distances' in locals() else [],
-                "unrelated_distances": unrelated_distances if 'unrelated_distances' in locals() else [],
-                "optimal_threshold": optimal_threshold if 'optimal_threshold' in locals() else None
+                "related_distances": related_distances,
+                "unrelated_distances": unrelated_distances,
+                "optimal_threshold": optimal_threshold,
+                "leaf_node_sweep": sweep_results
             }
-        }, f, indent=2)
-    
-    print(f"\n💾 Detailed results saved to: test_results/vector_search_evaluation_results.json")
+        }, "test_results/vector_search_evaluation_results.json")
+        
+        print(f"\n💾 Detailed results saved to: test_results/vector_search_evaluation_results.json")
     
     # Cleanup test file
     cleanup_test_file()
@@ -383,4 +597,11 @@ def run_comprehensive_evaluation():
     print("\n🎉 Evaluation Complete!")
 
 if __name__ == "__main__":
-    run_comprehensive_evaluation()
+    parser = argparse.ArgumentParser(description="Evaluate vector search with related and unrelated queries.")
+    parser.add_argument("--save-json", action="store_true", help="Save detailed results to test_results/")
+    parser.add_argument("--plot", action="store_true", help="Save the distance distribution plot to test_results/")
+    parser.add_argument("--full", action="store_true", help="Fetch the top 10 chunks per query instead of only the best match")
+    parser.add_argument("--sweep", action="store_true", help="Measure latency and separation for each leaf node fraction")
+    args = parser.parse_args()
+    
+    run_comprehensive_evaluation(save_json=args.save_json, plot=args.plot, full=args.full, sweep=args.sweep)
@@ -2,31 +2,45 @@
 """Script to update Postman collection with authentication token for all GET requests."""
 
 import json
-import re
+import os
+import shutil
+import tempfile
+from collections import deque
+from pathlib import Path
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+COLLECTION_PATH = Path('postman_collection.json')
+TOKEN_PARAM = "token={{auth_token}}"
+# Single-brace placeholder written by earlier versions of this script
+STALE_TOKEN_PARAM = "token={auth_token}"
 
 def update_url_with_token(url_raw):
     """Update URL to include token parameter if it's a GET request."""
+    # Repair the single-brace placeholder, which Postman does not substitute
+    if STALE_TOKEN_PARAM in url_raw and TOKEN_PARAM not in url_raw:
+        return url_raw.replace(STALE_TOKEN_PARAM, TOKEN_PARAM)
+    
     # Check if token already exists in the URL
     if 'token=' in url_raw:
         return url_raw
     
-    if '?' in url_raw:
-        # URL already has query parameters, add token
-        return f"{url_raw}&token={{auth_token}}"
-    else:
-        # URL has no query parameters, add token
-        return f"{url_raw}?token={{auth_token}}"
+    # Append to existing query parameters or start a new query string
+    return url_raw + ('&' if '?' in url_raw else '?') + TOKEN_PARAM
 
 def add_query_param_to_url(url_obj):
     """Add token query parameter to URL object."""
-    if 'query' not in url_obj:
-        url_obj['query'] = []
+    query = url_obj.setdefault('query', [])
     
     # Check if token already exists
-    token_exists = any(param.get('key') == 'token' for param in url_obj.get('query', []))
+    existing_keys = {param.get('key') for param in query}
     
-    if not token_exists:
-        url_obj['query'].append({
+    if 'token' not in existing_keys:
+        query.append({
             "key": "token",
             "value": "{{auth_token}}",
             "description": "Authentication token"
@@ -37,43 +51,64 @@ def add_query_param_to_url(url_obj):
 def update_request_with_auth(request):
     """Update a single request to include authentication."""
     # Update both GET and POST requests
-    if request.get('method') in ['GET', 'POST', 'DELETE', 'PUT', 'PATCH']:
-        # Update raw URL
-        if 'url' in request and 'raw' in request['url']:
-            request['url']['raw'] = update_url_with_token(request['url']['raw'])
+    if request.get('method') in ['GET', 'POST', 'DELETE', 'PUT', 'PATCH'] and 'url' in request:
+        url_obj = request['url']
         
-        # Update URL object with query parameters
-        if 'url' in request:
-            request['url'] = add_query_param_to_url(request['url'])
+        # Update raw URL and query parameters in a single visit
+        if 'raw' in url_obj:
+            url_obj['raw'] = update_url_with_token(url_obj['raw'])
+        request['url'] = add_query_param_to_url(url_obj)
     
     return request
 
-def update_item_recursively(item):
-    """Recursively update all items in the collection."""
-    if 'request' in item:
-        # This is a request item
-        item['request'] = update_request_with_auth(item['request'])
-    elif 'item' in item:
-        # This is a folder item, process its children
-        for sub_item in item['item']:
-            update_item_recursively(sub_item)
+def update_items(items):
+    """Update all request items in the collection, walking folders with an explicit stack."""
+    stack = deque(items)
+    while stack:
+        item = stack.pop()
+        if 'request' in item:
+            # This is a request item
+            item['request'] = update_request_with_auth(item['request'])
+        elif 'item' in item:
+            # This is a folder item, queue its children
+            stack.extend(item['item'])
+
+def load_collection(path):
+    """Read a Postman collection, using orjson when it is installed."""
+    data = path.read_bytes()
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+def save_collection(collection, path):
+    """Write a Postman collection atomically, using orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        data = orjson.dumps(collection, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(collection, indent=2).encode('utf-8')
     
-    return item
+    # Write to a temporary file next to the collection and swap it in, so an
+    # interrupted run never leaves a truncated collection behind
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        # mkstemp creates the file as 0600; keep the collection's original mode
+        if path.exists():
+            shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
 
 def main():
     """Main function to update the Postman collection."""
     # Read the current collection
-    with open('postman_collection.json', 'r') as f:
-        collection = json.load(f)
+    collection = load_collection(COLLECTION_PATH)
     
-    # Update all items recursively
-    if 'item' in collection:
-        for item in collection['item']:
-            update_item_recursively(item)
+    # Update all items, including those in nested folders
+    update_items(collection.get('item', []))
     
     # Write the updated collection back
-    with open('postman_collection.json', 'w') as f:
-        json.dump(collection, f, indent=2)
+    save_collection(collection, COLLECTION_PATH)
     
     print("✅ Postman collection updated with authentication token for all requests")
 
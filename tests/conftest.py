@@ -1,28 +1,84 @@
 """Pytest configuration and fixtures."""
 
-import asyncio
-from unittest.mock import AsyncMock, Mock
+from unittest.mock import AsyncMock, MagicMock, Mock
 
 import pytest
-from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
+from pytest_asyncio import is_async_test
 
 from app.core.config import rag_config, settings
 from app.main import app
 from app.services.rag_search_service import RAGSearchService
 
+# All routers are registered at import; freeze the route table so tests cannot mutate it
+app.router.routes = tuple(app.router.routes)
+
+
+def pytest_collection_modifyitems(items):
+    """Run every async test on the session-scoped event loop."""
+    session_loop_marker = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if is_async_test(item):
+            item.add_marker(session_loop_marker, append=False)
+
 
 @pytest.fixture(scope="session")
-def event_loop():
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+async def client():
+    """Create an async test client shared across the test session."""
+    # Requests are dispatched to the ASGI app in-process on the session event loop
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as test_client:
+        yield test_client
 
 
-@pytest.fixture
-def client():
-    """Create a test client."""
-    return TestClient(app)
+@pytest.fixture(scope="session", autouse=True)
+async def _warm_up_app(client):
+    """Send one request so the lazily built middleware stack is not charged to the first test."""
+    await client.get("/")
+
+
+@pytest.fixture(scope="session")
+def cached_get(client):
+    """GET helper that memoizes responses by path, for read-only endpoints tested without patches."""
+    responses = {}
+    # Send the API token so protected routes are memoized as real responses, not 401s
+    auth_params = {"token": settings.api_auth_token}
+
+    async def get(path):
+        if path not in responses:
+            responses[path] = await client.get(path, params=auth_params)
+        return responses[path]
+
+    return get
+
+
+@pytest.fixture(autouse=True)
+def _reset_dependency_overrides():
+    """Clear dependency overrides so the shared client starts each test clean."""
+    yield
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture(scope="session")
+def mock_pool():
+    """Service mocks built once per session and reset between tests."""
+    # Only the methods the endpoints await are AsyncMocks; everything else stays synchronous
+    return {
+        # The files endpoints call the GCS client synchronously
+        "bucket": MagicMock(),
+        "rag": MagicMock(
+            search_documents=AsyncMock(),
+            search_documents_batch=AsyncMock(),
+            embed_queries=AsyncMock(),
+        ),
+    }
+
+
+@pytest.fixture(autouse=True)
+def _reset_mock_pool(mock_pool):
+    """Reset the pooled mocks in one pass after each test instead of rebuilding them."""
+    yield
+    for mock in mock_pool.values():
+        mock.reset_mock(return_value=True, side_effect=True)
 
 
 @pytest.fixture
@@ -33,27 +89,27 @@ def mock_rag_search_service():
     return service
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_file_content():
     """Sample file content for testing."""
     return b"This is a sample document content for testing purposes."
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_pdf_content():
     """Sample PDF content for testing."""
     # This would be actual PDF bytes in a real test
     return b"%PDF-1.4\n1 0 obj\n<<\n/Type /Catalog\n/Pages 2 0 R\n>>\nendobj\n"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_image_content():
     """Sample image content for testing."""
     # This would be actual image bytes in a real test
     return b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x08\x06\x00\x00\x00\x1f\x15\xc4\x89\x00\x00\x00\nIDATx\x9cc\x00\x01\x00\x00\x05\x00\x01\r\n-\xdb\x00\x00\x00\x00IEND\xaeB`\x82"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_search_request():
     """Sample search request for testing."""
     from app.models.schemas import SearchRequest
@@ -61,7 +117,7 @@ def sample_search_request():
     return SearchRequest(query="test query", max_results=10, similarity_threshold=0.7)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_chunks():
     """Sample chunks for testing."""
     from app.models.schemas import ChunkInfo
@@ -82,7 +138,7 @@ def sample_chunks():
     ]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_search_results():
     """Sample search results for testing."""
     from app.models.schemas import SearchResult
@@ -93,7 +149,7 @@ def sample_search_results():
             file_id="file_1",
             filename="test.pdf",
             chunk_index=0,
-            similarity_score=0.95,
+            distance=0.95,
             metadata={"type": "text"},
         )
     ]
@@ -1,210 +1,167 @@
 """Tests for file management API endpoints."""
 
-from unittest.mock import AsyncMock, patch
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
 
 import pytest
-from fastapi.testclient import TestClient
 
-from app.main import app
+from app.core.config import settings
+
+# AuthMiddleware requires the API token as a query parameter on every /api/v1 route
+_AUTH_PARAMS = {"token": settings.api_auth_token}
+
+
+def _listed_blob(name, day=1, size=1000, content_type="application/pdf", tags=""):
+    """A GCS blob as returned by bucket.list_blobs, with only the attributes the list endpoint reads."""
+    return SimpleNamespace(
+        name=f"uploads/{name}",
+        metadata={"tags": tags} if tags else None,
+        content_type=content_type,
+        time_created=datetime(2023, 1, day, tzinfo=timezone.utc),
+        updated=None,
+        size=size,
+    )
+
+
+# Bucket listings shared by the list tests; built once at import
+_MOCK_FILES = (
+    _listed_blob("test1.pdf", day=2, tags="test,document"),
+    _listed_blob("test2.txt", day=1, size=500, content_type="text/plain"),
+)
+_MOCK_PAGINATION_FILES = tuple(_listed_blob(f"test{i}.pdf", day=i + 1) for i in range(5))
+_MOCK_SEARCH_FILES = (
+    _listed_blob("test_document.pdf"),
+    _listed_blob("notes.txt", content_type="text/plain"),
+)
+_MOCK_TAGGED_FILES = (
+    _listed_blob("test.pdf", tags="product,catalog"),
+    _listed_blob("untagged.pdf"),
+)
+
+
+@pytest.fixture
+def mock_bucket(mock_pool):
+    """Patch the files endpoints' GCS client so every bucket lookup returns the pooled bucket mock."""
+    bucket = mock_pool["bucket"]
+    with patch("app.api.v1.files.storage.Client") as client_class:
+        client_class.return_value.bucket.return_value = bucket
+        yield bucket
 
 
 @pytest.fixture
-def client():
-    """Create test client."""
-    return TestClient(app)
+def mock_blob(mock_bucket):
+    """A stored blob returned by bucket.blob(), present unless a test says otherwise."""
+    blob = MagicMock()
+    blob.exists.return_value = True
+    mock_bucket.blob.return_value = blob
+    return blob
 
 
-@pytest.mark.asyncio
-async def test_list_files_success(client):
+async def test_list_files_success(client, mock_bucket):
     """Test successful file listing."""
-    with patch("app.api.v1.files.StorageService") as mock_storage_class:
-        mock_storage = AsyncMock()
-        mock_files = [
-            {
-                "name": "test1.pdf",
-                "path": "uploads/test1.pdf",
-                "file_type": "application/pdf (.pdf)",
-                "last_updated": "2023-01-01T00:00:00Z",
-                "size": 1000,
-                "tags": ["test", "document"]
-            },
-            {
-                "name": "test2.txt",
-                "path": "uploads/test2.txt",
-                "file_type": "text/plain (.txt)",
-                "last_updated": "2023-01-02T00:00:00Z",
-                "size": 500,
-                "tags": []
-            }
-        ]
-        mock_storage.list_files.return_value = mock_files
-        mock_storage_class.return_value = mock_storage
-
-        response = client.get("/api/v1/files/list")
-
-        assert response.status_code == 200
-        data = response.json()
-        assert data["success"] is True
-        assert len(data["files"]) == 2
-        assert data["files"][0]["name"] == "test1.pdf"
-
-
-@pytest.mark.asyncio
-async def test_list_files_with_pagination(client):
+    mock_bucket.list_blobs.return_value = list(_MOCK_FILES)
+
+    response = await client.get("/api/v1/files/list", params=_AUTH_PARAMS)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["success"] is True
+    assert len(data["files"]) == 2
+    assert data["files"][0]["name"] == "test1.pdf"
+    assert data["files"][0]["tags"] == ["test", "document"]
+
+
+async def test_list_files_with_pagination(client, mock_bucket):
     """Test file listing with pagination."""
-    with patch("app.api.v1.files.StorageService") as mock_storage_class:
-        mock_storage = AsyncMock()
-        mock_files = [
-            {
-                "name": f"test{i}.pdf",
-                "path": f"uploads/test{i}.pdf",
-                "file_type": "application/pdf (.pdf)",
-                "last_updated": "2023-01-01T00:00:00Z",
-                "size": 1000,
-                "tags": []
-            }
-            for i in range(5)
-        ]
-        mock_storage.list_files.return_value = mock_files
-        mock_storage_class.return_value = mock_storage
-
-        response = client.get("/api/v1/files/list?limit=3&offset=1")
-
-        assert response.status_code == 200
-        data = response.json()
-        assert data["success"] is True
-        assert data["limit"] == 3
-        assert data["offset"] == 1
-
-
-@pytest.mark.asyncio
-async def test_list_files_with_search(client):
+    mock_bucket.list_blobs.return_value = list(_MOCK_PAGINATION_FILES)
+
+    response = await client.get("/api/v1/files/list", params={**_AUTH_PARAMS, "limit": 3, "offset": 1})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["success"] is True
+    assert data["limit"] == 3
+    assert data["offset"] == 1
+    assert len(data["files"]) == 3
+
+
+async def test_list_files_with_search(client, mock_bucket):
     """Test file listing with search query."""
-    with patch("app.api.v1.files.StorageService") as mock_storage_class:
-        mock_storage = AsyncMock()
-        mock_files = [
-            {
-                "name": "test_document.pdf",
-                "path": "uploads/test_document.pdf",
-                "file_type": "application/pdf (.pdf)",
-                "last_updated": "2023-01-01T00:00:00Z",
-                "size": 1000,
-                "tags": []
-            }
-        ]
-        mock_storage.list_files.return_value = mock_files
-        mock_storage_class.return_value = mock_storage
-
-        response = client.get("/api/v1/files/list?search=document")
-
-        assert response.status_code == 200
-        data = response.json()
-        assert data["success"] is True
-        assert data["search_query"] == "document"
-
-
-@pytest.mark.asyncio
-async def test_list_files_with_tags(client):
+    mock_bucket.list_blobs.return_value = list(_MOCK_SEARCH_FILES)
+
+    response = await client.get("/api/v1/files/list", params={**_AUTH_PARAMS, "search": "document"})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["success"] is True
+    assert data["search_query"] == "document"
+    assert [file["name"] for file in data["files"]] == ["test_document.pdf"]
+
+
+async def test_list_files_with_tags(client, mock_bucket):
     """Test file listing with tag filtering."""
-    with patch("app.api.v1.files.StorageService") as mock_storage_class:
-        mock_storage = AsyncMock()
-        mock_files = [
-            {
-                "name": "test.pdf",
-                "path": "uploads/test.pdf",
-                "file_type": "application/pdf (.pdf)",
-                "last_updated": "2023-01-01T00:00:00Z",
-                "size": 1000,
-                "tags": ["product", "catalog"]
-            }
-        ]
-        mock_storage.list_files.return_value = mock_files
-        mock_storage_class.return_value = mock_storage
-
-        response = client.get("/api/v1/files/list?tags=product,catalog")
-
-        assert response.status_code == 200
-        data = response.json()
-        assert data["success"] is True
-        assert data["tags_filter"] == ["product", "catalog"]
-
-
-@pytest.mark.asyncio
-async def test_view_file_success(client):
+    mock_bucket.list_blobs.return_value = list(_MOCK_TAGGED_FILES)
+
+    response = await client.get("/api/v1/files/list", params={**_AUTH_PARAMS, "tags": "product,catalog"})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["success"] is True
+    assert data["tags_filter"] == ["product", "catalog"]
+    assert [file["name"] for file in data["files"]] == ["test.pdf"]
+
+
+async def test_view_file_success(client, mock_blob):
     """Test successful file download."""
-    with patch("app.api.v1.files.StorageService") as mock_storage_class:
-        mock_storage = AsyncMock()
-        mock_content = b"Test file content"
-        mock_storage.download_file.return_value = mock_content
-        mock_storage_class.return_value = mock_storage
+    mock_content = b"Test file content"
+    mock_blob.download_as_bytes.return_value = mock_content
+    mock_blob.content_type = "application/pdf"
 
-        response = client.get("/api/v1/files/view?filename=test.pdf")
+    response = await client.get("/api/v1/files/view", params={**_AUTH_PARAMS, "filename": "test.pdf"})
 
-        assert response.status_code == 200
-        assert response.content == mock_content
-        assert response.headers["content-type"] == "application/pdf"
+    assert response.status_code == 200
+    assert response.content == mock_content
+    assert response.headers["content-type"] == "application/pdf"
 
 
-@pytest.mark.asyncio
-async def test_view_file_not_found(client):
+async def test_view_file_not_found(client, mock_blob):
     """Test file download when file not found."""
-    with patch("app.api.v1.files.StorageService") as mock_storage_class:
-        mock_storage = AsyncMock()
-        mock_storage.download_file.side_effect = FileNotFoundError("File not found")
-        mock_storage_class.return_value = mock_storage
+    mock_blob.exists.return_value = False
 
-        response = client.get("/api/v1/files/view?filename=nonexistent.pdf")
+    response = await client.get("/api/v1/files/view", params={**_AUTH_PARAMS, "filename": "nonexistent.pdf"})
 
-        assert response.status_code == 404
-        data = response.json()
-        assert data["success"] is False
-        assert "not found" in data["error"].lower()
+    assert response.status_code == 404
+    data = response.json()
+    assert data["error_code"] == "404"
+    assert "not found" in data["error"].lower()
 
 
-@pytest.mark.asyncio
-async def test_get_embedding_stats_success(client):
+async def test_get_embedding_stats_success(client, mock_blob):
     """Test successful embedding stats retrieval."""
-    with patch("app.api.v1.files.StorageService") as mock_storage_class, \
-         patch("app.api.v1.files.VectorSearchService") as mock_vector_class:
-        
-        mock_storage = AsyncMock()
-        mock_storage.get_file_metadata.return_value = {
-            "name": "test.pdf",
-            "path": "uploads/test.pdf",
-            "file_type": "application/pdf (.pdf)",
-            "last_updated": "2023-01-01T00:00:00Z",
-            "size": 1000
-        }
-        mock_storage_class.return_value = mock_storage
-        
-        mock_vector = AsyncMock()
-        mock_vector.get_embeddings_by_metadata.return_value = {
-            "total_embeddings": 5,
-            "datapoint_ids": ["test_0", "test_1", "test_2", "test_3", "test_4"],
-            "has_embeddings": True
-        }
-        mock_vector_class.return_value = mock_vector
-
-        response = client.get("/api/v1/files/embedding-stats?filename=test.pdf")
-
-        assert response.status_code == 200
-        data = response.json()
-        assert data["success"] is True
-        assert data["embedding_stats"]["total_embeddings"] == 5
-        assert data["embedding_stats"]["has_embeddings"] is True
-
-
-@pytest.mark.asyncio
-async def test_get_embedding_stats_file_not_found(client):
+    mock_blob.content_type = "application/pdf"
+    mock_blob.time_created = datetime(2023, 1, 1, tzinfo=timezone.utc)
+    mock_blob.size = 1000
+    mock_blob.metadata = {"datapoint_ids": "test_0,test_1,test_2,test_3,test_4"}
+
+    response = await client.get("/api/v1/files/embedding-stats", params={**_AUTH_PARAMS, "filename": "test.pdf"})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["success"] is True
+    assert data["embedding_stats"]["total_embeddings"] == 5
+    assert data["embedding_stats"]["has_embeddings"] is True
+
+
+async def test_get_embedding_stats_file_not_found(client, mock_blob):
     """Test embedding stats when file not found."""
-    with patch("app.api.v1.files.StorageService") as mock_storage_class:
-        mock_storage = AsyncMock()
-        mock_storage.get_file_metadata.side_effect = FileNotFoundError("File not found")
-        mock_storage_class.return_value = mock_storage
+    mock_blob.exists.return_value = False
 
-        response = client.get("/api/v1/files/embedding-stats?filename=nonexistent.pdf")
+    response = await client.get(
+        "/api/v1/files/embedding-stats", params={**_AUTH_PARAMS, "filename": "nonexistent.pdf"}
+    )
 
-        assert response.status_code == 404
-        data = response.json()
-        assert data["success"] is False
-        assert "not found" in data["error"].lower()
\ No newline at end of file
+    assert response.status_code == 404
+    data = response.json()
+    assert data["error_code"] == "404"
+    assert "not found" in data["error"].lower()
@@ -1,164 +1,239 @@
 """Tests for RAG search API endpoints."""
 
-from unittest.mock import AsyncMock, patch
+from unittest.mock import patch
 
 import pytest
-from fastapi.testclient import TestClient
-
-from app.main import app
 
+from app.core.config import rag_config, settings
+
+# Service response shared by the RAG search tests; built once at import
+_RAG_RESPONSE = {
+    "success": True,
+    "query": "test query",
+    "files": [],
+    "total_files": 0,
+    "total_chunks": 0,
+    "rag_response": "Generated response",
+    "processing_time_ms": 100.0,
+    "search_parameters": {}
+}
+_SERVICE_ERROR = RuntimeError("Service error")
+# AuthMiddleware requires the API token as a query parameter on every /api/v1 route
+_AUTH_PARAMS = {"token": settings.api_auth_token}
+_EMBEDDING_DIMENSIONS = rag_config.vector_search["dimensions"]
 
 @pytest.fixture
-def client():
-    """Create test client."""
-    return TestClient(app)
-
-
-@pytest.mark.asyncio
-async def test_rag_search_documents_post_success(client, sample_search_results):
-    """Test successful RAG document search via POST."""
-    with patch("app.api.v1.search.RAGSearchService") as mock_rag_service_class:
-        mock_service = AsyncMock()
-        mock_response = {
-            "success": True,
-            "query": "test query",
-            "files": [],
-            "total_files": 0,
-            "total_chunks": len(sample_search_results),
-            "rag_response": "Generated response",
-            "processing_time_ms": 100.0,
-            "search_parameters": {}
-        }
-        mock_service.search_documents.return_value = mock_response
-        mock_rag_service_class.return_value = mock_service
-
-        search_data = {
-            "query": "test query",
-            "ktop": 10,
-            "threshold": 0.7,
-        }
-        response = client.post("/api/v1/search/rag", json=search_data)
+def mock_service(mock_pool):
+    """Patch the search endpoints' RAG search service with the pooled RAG mock."""
+    with patch("app.api.v1.search.RAGSearchService", return_value=mock_pool["rag"]):
+        yield mock_pool["rag"]
+
+
+@pytest.mark.parametrize(
+    "extra",
+    [
+        {},
+        {"file_ids": ["file1.pdf", "file2.pdf"]},
+        {"tags": ["product", "catalog"]},
+    ],
+    ids=["no_filters", "file_ids", "tags"],
+)
+async def test_rag_search_documents_post_success(client, mock_service, sample_search_results, extra):
+    """Test successful RAG document search via POST, with and without filters."""
+    mock_response = {**_RAG_RESPONSE, "total_chunks": len(sample_search_results), "search_parameters": extra}
+    mock_service.search_documents.return_value = mock_response
+
+    search_data = {
+        "query": "test query",
+        "ktop": 10,
+        "threshold": 0.7,
+        **extra
+    }
+    response = await client.post("/api/v1/search/rag", params=_AUTH_PARAMS, json=search_data)
 
-        assert response.status_code == 200
-        data = response.json()
-        assert data["success"] is True
-        assert data["query"] == "test query"
-        assert data["total_chunks"] == len(sample_search_results)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["success"] is True
+    assert data["query"] == "test query"
+    assert data["total_chunks"] == len(sample_search_results)
+    assert data["search_parameters"] == extra
 
 
-@pytest.mark.asyncio
-async def test_rag_search_documents_get_success(client, sample_search_results):
+async def test_rag_search_documents_get_success(client, mock_service, sample_search_results):
     """Test successful RAG document search via GET."""
-    with patch("app.api.v1.search.RAGSearchService") as mock_rag_service_class:
-        mock_service = AsyncMock()
-        mock_response = {
-            "success": True,
-            "query": "test query",
-            "files": [],
-            "total_files": 0,
-            "total_chunks": len(sample_search_results),
-            "rag_response": "Generated response",
-            "processing_time_ms": 100.0,
-            "search_parameters": {}
-        }
-        mock_service.search_documents.return_value = mock_response
-        mock_rag_service_class.return_value = mock_service
+    mock_response = {**_RAG_RESPONSE, "total_chunks": len(sample_search_results)}
+    mock_service.search_documents.return_value = mock_response
 
-        response = client.get("/api/v1/search/rag?query=test%20query&ktop=10&threshold=0.7")
+    response = await client.get(
+        "/api/v1/search/rag",
+        params={**_AUTH_PARAMS, "query": "test query", "ktop": 10, "threshold": 0.7}
+    )
 
-        assert response.status_code == 200
-        data = response.json()
-        assert data["success"] is True
-        assert data["query"] == "test query"
+    assert response.status_code == 200
+    data = response.json()
+    assert data["success"] is True
+    assert data["query"] == "test query"
 
 
-@pytest.mark.asyncio
-async def test_rag_search_documents_with_file_ids(client, sample_search_results):
-    """Test RAG document search with file IDs filter."""
-    with patch("app.api.v1.search.RAGSearchService") as mock_rag_service_class:
-        mock_service = AsyncMock()
-        mock_response = {
-            "success": True,
-            "query": "test query",
-            "files": [],
-            "total_files": 0,
-            "total_chunks": len(sample_search_results),
-            "rag_response": "Generated response",
-            "processing_time_ms": 100.0,
-            "search_parameters": {"file_ids": ["file1.pdf", "file2.pdf"]}
-        }
-        mock_service.search_documents.return_value = mock_response
-        mock_rag_service_class.return_value = mock_service
+async def test_rag_search_documents_service_error(client, mock_service):
+    """Test RAG document search with service error."""
+    mock_service.search_documents.side_effect = _SERVICE_ERROR
+
+    search_data = {
+        "query": "test query",
+        "ktop": 10,
+        "threshold": 0.7,
+    }
+    response = await client.post("/api/v1/search/rag", params=_AUTH_PARAMS, json=search_data)
+
+    assert response.status_code == 500
+    data = response.json()
+    assert "Internal server error" in data["error"]
+
+
+async def test_rag_search_documents_batch_success(client, mock_service):
+    """Test successful batched RAG document search."""
+    mock_response = {
+        "success": True,
+        "results": [{**_RAG_RESPONSE, "query": query} for query in ["first query", "second query"]],
+        "total_queries": 2,
+        "processing_time_ms": 200.0,
+        "vector_search_ms": 12.5
+    }
+    mock_service.search_documents_batch.return_value = mock_response
+
+    search_data = {
+        "queries": ["first query", "second query"],
+        "ktop": 10,
+        "threshold": 0.3,
+    }
+    response = await client.post("/api/v1/search/rag/batch", params=_AUTH_PARAMS, json=search_data)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["success"] is True
+    assert data["total_queries"] == 2
+    assert data["vector_search_ms"] == 12.5
+    assert [result["query"] for result in data["results"]] == ["first query", "second query"]
 
-        search_data = {
-            "query": "test query",
-            "ktop": 10,
-            "threshold": 0.7,
-            "file_ids": ["file1.pdf", "file2.pdf"]
-        }
-        response = client.post("/api/v1/search/rag", json=search_data)
 
-        assert response.status_code == 200
-        data = response.json()
-        assert data["success"] is True
-        assert data["query"] == "test query"
+async def test_rag_search_documents_batch_requires_queries(client):
+    """Test batched RAG document search rejects an empty query list."""
+    response = await client.post("/api/v1/search/rag/batch", params=_AUTH_PARAMS, json={"queries": []})
 
+    assert response.status_code == 422
 
-@pytest.mark.asyncio
-async def test_rag_search_documents_with_tags(client, sample_search_results):
-    """Test RAG document search with tags filter."""
-    with patch("app.api.v1.search.RAGSearchService") as mock_rag_service_class:
-        mock_service = AsyncMock()
-        mock_response = {
-            "success": True,
+
+async def test_rag_search_documents_with_leaf_node_fraction(client, mock_service):
+    """Test RAG document search passes the leaf node fraction to the service."""
+    mock_service.search_documents.return_value = {
+        **_RAG_RESPONSE, "search_parameters": {"fraction_leaf_nodes_to_search": 0.2}
+    }
+
+    response = await client.post(
+        "/api/v1/search/rag",
+        params=_AUTH_PARAMS,
+        json={"query": "test query", "fraction_leaf_nodes_to_search": 0.2}
+    )
+
+    assert response.status_code == 200
+    search_request = mock_service.search_documents.call_args[0][0]
+    assert search_request.fraction_leaf_nodes_to_search == 0.2
+
+
+async def test_rag_search_documents_rejects_invalid_leaf_node_fraction(client):
+    """Test RAG document search rejects a leaf node fraction above 1."""
+    response = await client.post(
+        "/api/v1/search/rag",
+        params=_AUTH_PARAMS,
+        json={"query": "test query", "fraction_leaf_nodes_to_search": 1.5}
+    )
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "fraction_leaf_nodes_to_search"]
+
+
+async def test_embed_queries_success(client, mock_service):
+    """Test embedding search queries for client-side caching."""
+    mock_service.embed_queries.return_value = {
+        "success": True,
+        "model": settings.vertex_ai_embedding_model_name,
+        "embeddings": [[0.1, 0.2], [0.3, 0.4]],
+        "processing_time_ms": 50.0
+    }
+
+    response = await client.post(
+        "/api/v1/search/embed", params=_AUTH_PARAMS, json={"queries": ["first query", "second query"]}
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["model"] == settings.vertex_ai_embedding_model_name
+    assert data["embeddings"] == [[0.1, 0.2], [0.3, 0.4]]
+
+
+async def test_get_embedding_model(client):
+    """Test the embedding model probe reports the model and dimensions without embedding."""
+    response = await client.get("/api/v1/search/embed", params=_AUTH_PARAMS)
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "model": settings.vertex_ai_embedding_model_name,
+        "dimensions": _EMBEDDING_DIMENSIONS
+    }
+
+
+async def test_rag_search_documents_rejects_embedding_from_other_model(client):
+    """Test RAG document search rejects a precomputed embedding from a different model."""
+    response = await client.post(
+        "/api/v1/search/rag",
+        params=_AUTH_PARAMS,
+        json={
             "query": "test query",
-            "files": [],
-            "total_files": 0,
-            "total_chunks": len(sample_search_results),
-            "rag_response": "Generated response",
-            "processing_time_ms": 100.0,
-            "search_parameters": {"tags": ["product", "catalog"]}
+            "embedding": [0.1] * _EMBEDDING_DIMENSIONS,
+            "embedding_model": "some-other-model"
         }
-        mock_service.search_documents.return_value = mock_response
-        mock_rag_service_class.return_value = mock_service
+    )
 
-        search_data = {
+    assert response.status_code == 400
+    assert "model" in response.json()["error"]
+
+
+async def test_rag_search_documents_rejects_embedding_with_wrong_dimensions(client):
+    """Test RAG document search rejects a precomputed embedding of the wrong length."""
+    response = await client.post(
+        "/api/v1/search/rag",
+        params=_AUTH_PARAMS,
+        json={
             "query": "test query",
-            "ktop": 10,
-            "threshold": 0.7,
-            "tags": ["product", "catalog"]
+            "embedding": [0.1, 0.2],
+            "embedding_model": settings.vertex_ai_embedding_model_name
         }
-        response = client.post("/api/v1/search/rag", json=search_data)
+    )
 
-        assert response.status_code == 200
-        data = response.json()
-        assert data["success"] is True
-        assert data["query"] == "test query"
+    assert response.status_code == 400
+    assert str(_EMBEDDING_DIMENSIONS) in response.json()["error"]
 
 
-@pytest.mark.asyncio
-async def test_rag_search_documents_service_error(client):
-    """Test RAG document search with service error."""
-    with patch("app.api.v1.search.RAGSearchService") as mock_rag_service_class:
-        mock_service = AsyncMock()
-        mock_service.search_documents.side_effect = Exception("Service error")
-        mock_rag_service_class.return_value = mock_service
-
-        search_data = {
-            "query": "test query",
-            "ktop": 10,
-            "threshold": 0.7,
+async def test_rag_search_documents_batch_rejects_embedding_count_mismatch(client):
+    """Test batched RAG document search requires one precomputed embedding per query."""
+    response = await client.post(
+        "/api/v1/search/rag/batch",
+        params=_AUTH_PARAMS,
+        json={
+            "queries": ["first query", "second query"],
+            "embeddings": [[0.1] * _EMBEDDING_DIMENSIONS],
+            "embedding_model": settings.vertex_ai_embedding_model_name
         }
-        response = client.post("/api/v1/search/rag", json=search_data)
+    )
 
-        assert response.status_code == 500
-        data = response.json()
-        assert "Internal server error" in data["detail"]
+    assert response.status_code == 400
+    assert response.json()["error"] == "Expected one embedding per query"
 
 
-def test_search_health_check(client):
+async def test_search_health_check(cached_get):
     """Test search health check endpoint."""
-    response = client.get("/api/v1/search/health")
+    response = await cached_get("/api/v1/search/health")
     
     assert response.status_code == 200
     data = response.json()
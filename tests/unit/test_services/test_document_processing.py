@@ -1,32 +1,42 @@
 """Tests for document processing with different file types."""
 
 import asyncio
-import os
+import hashlib
+import io
+import re
 from pathlib import Path
+from typing import Dict
 from unittest.mock import AsyncMock, Mock, patch
 
+import PyPDF2
 import pytest
 
 from app.core.exceptions import (DocumentProcessingError,
                                  UnsupportedFileFormatError)
 from app.services.gemini_document_processor import GeminiDocumentProcessor
+from app.utils.ingestion.chunking import ChunkingStrategy
+from app.utils.ingestion.text_cleaner import TextCleaner
+
+_TEST_DATA_DIR = Path(__file__).resolve().parents[3] / "test_data"
+_EXPECTED_DATA_DIRS = frozenset({"tables", "images", "excel", "text"})
+_XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+_STRUCTURE_KEYWORDS = re.compile(r"sheet|column|row|data|dimensions", re.IGNORECASE)
 
 
 class MockGeminiDocumentProcessor(GeminiDocumentProcessor):
     """Mock version that doesn't require authentication."""
 
+    # PDF page counts keyed by content digest, so repeated tests skip re-parsing
+    _pdf_page_counts: Dict[bytes, int] = {}
+    # Upper bound on page analyses in flight at once
+    MAX_CONCURRENT_PAGES = 8
+
     def __init__(self):
         # Initialize without calling parent __init__ to avoid authentication
-        from app.utils.ingestion.chunking import ChunkingStrategy
-        from app.utils.ingestion.text_cleaner import TextCleaner
-
         self.chunking_strategy = ChunkingStrategy()
         self.text_cleaner = TextCleaner()
 
-    async def _analyze_with_gemini(self, content: str, prompt: str) -> str:
-        """Mock Gemini analysis that returns sample content."""
-        if "table" in prompt.lower():
-            return """
+    _TABLE_RESPONSE = """
             **Table Analysis:**
             - Product Name: Apple, Price: $1.50, Quantity: 10, Total: $15.00
             - Product Name: Banana, Price: $0.75, Quantity: 20, Total: $15.00
@@ -34,8 +44,7 @@ class MockGeminiDocumentProcessor(GeminiDocumentProcessor):
             - Product Name: Grape, Price: $3.00, Quantity: 8, Total: $24.00
             - **Total Sales: $64.00**
             """
-        elif "diagram" in prompt.lower() or "flowchart" in prompt.lower():
-            return """
+    _FLOWCHART_RESPONSE = """
             **Flowchart Analysis:**
             This is a RAG system flowchart showing:
             1. Document Ingestion → Text Chunking
@@ -44,8 +53,7 @@ class MockGeminiDocumentProcessor(GeminiDocumentProcessor):
             4. Query Processing → Document Retrieval
             5. Document Retrieval → Response Generation
             """
-        elif "business card" in prompt.lower():
-            return """
+    _BUSINESS_CARD_RESPONSE = """
             **Business Card Analysis:**
             Company: Tech Solutions Inc.
             Name: John Smith
@@ -54,8 +62,7 @@ class MockGeminiDocumentProcessor(GeminiDocumentProcessor):
             Phone: (555) 123-4567
             Address: 123 Tech Street, Silicon Valley, CA 94000
             """
-        else:
-            return """
+    _DEFAULT_RESPONSE = """
             **Document Analysis:**
             This document contains technical information about RAG systems.
             Key topics include:
@@ -64,36 +71,59 @@ class MockGeminiDocumentProcessor(GeminiDocumentProcessor):
             - Benefits and use cases
             - Future trends in AI
             """
+    # Checked in order; prompts are matched case-sensitively, so keep them lowercase
+    _RESPONSES = (
+        ("table", _TABLE_RESPONSE),
+        ("diagram", _FLOWCHART_RESPONSE),
+        ("flowchart", _FLOWCHART_RESPONSE),
+        ("business card", _BUSINESS_CARD_RESPONSE),
+    )
+
+    async def _analyze_with_gemini(self, content: str, prompt: str) -> str:
+        """Mock Gemini analysis that returns sample content."""
+        for keyword, response in self._RESPONSES:
+            if keyword in prompt:
+                return response
+        return self._DEFAULT_RESPONSE
 
     async def _process_pdf_with_gemini(self, file_content: bytes, filename: str):
         """Mock PDF processing."""
-        from pdf2image import convert_from_bytes
-
         from app.models.schemas import ChunkInfo
 
         try:
-            # Convert PDF to images
-            images = convert_from_bytes(file_content)
-            chunks = []
-
-            for i, image in enumerate(images):
-                # Mock analysis for each page
-                prompt = "Analyze this document page for tables, text, and diagrams."
-                analysis = await self._analyze_with_gemini("", prompt)
-
-                chunk = ChunkInfo(
+            # Only the page count is used, so read it with PyPDF2 instead of rasterizing
+            key = hashlib.blake2b(file_content, digest_size=16).digest()
+            page_count = self._pdf_page_counts.get(key)
+            if page_count is None:
+                reader = PyPDF2.PdfReader(io.BytesIO(file_content))
+                page_count = self._pdf_page_counts[key] = len(reader.pages)
+
+            # Mock analysis for each page, run concurrently like per-page Gemini calls
+            prompt = "analyze this document page for tables, text, and diagrams."
+            semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_PAGES)
+
+            async def analyze_page():
+                async with semaphore:
+                    return await self._analyze_with_gemini("", prompt)
+
+            analyses = await asyncio.gather(*(analyze_page() for _ in range(page_count)))
+
+            base_metadata = {
+                "type": "pdf_page",
+                "processor": "gemini_mock",
+                "filename": filename,
+                "total_pages": page_count,
+            }
+            # Trusted values, so skip pydantic validation
+            chunks = [
+                ChunkInfo.model_construct(
                     chunk_id=f"{filename}_page_{i+1}",
                     content=analysis,
                     chunk_index=i,
-                    metadata={
-                        "type": "pdf_page",
-                        "processor": "gemini_mock",
-                        "filename": filename,
-                        "page_number": i + 1,
-                        "total_pages": len(images),
-                    },
+                    metadata={**base_metadata, "page_number": i + 1},
                 )
-                chunks.append(chunk)
+                for i, analysis in enumerate(analyses)
+            ]
 
             return chunks
         except Exception as e:
@@ -104,11 +134,11 @@ class MockGeminiDocumentProcessor(GeminiDocumentProcessor):
         from app.models.schemas import ChunkInfo
 
         try:
-            # Mock analysis for image
-            prompt = "Analyze this image for text, tables, or diagrams."
+            # Mock analysis for image (trusted values, so validation is skipped)
+            prompt = "analyze this image for text, tables, or diagrams."
             analysis = await self._analyze_with_gemini("", prompt)
 
-            chunk = ChunkInfo(
+            chunk = ChunkInfo.model_construct(
                 chunk_id=f"{filename}_image",
                 content=analysis,
                 chunk_index=0,
@@ -126,148 +156,130 @@ class MockGeminiDocumentProcessor(GeminiDocumentProcessor):
             )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_processor():
-    """Create mock document processor for testing."""
+    """Create mock document processor for testing, shared across the session (it holds no per-test state)."""
     return MockGeminiDocumentProcessor()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def test_data_dir():
     """Get the test data directory."""
-    return Path(__file__).parent.parent.parent.parent / "test_data"
+    return _TEST_DATA_DIR
 
 
-@pytest.fixture
-def verify_test_data_files(test_data_dir):
-    """Verify that test_data directory exists and contains expected files."""
-    assert test_data_dir.exists(), f"test_data directory not found: {test_data_dir}"
+@pytest.fixture(scope="session")
+def existing_files():
+    """Files under test_data keyed by relative POSIX path, listed once per session."""
+    if not _TEST_DATA_DIR.is_dir():
+        return {}
+    return {
+        path.relative_to(_TEST_DATA_DIR).as_posix(): path
+        for path in _TEST_DATA_DIR.rglob("*")
+        if path.is_file()
+    }
 
-    # Check for expected subdirectories
-    expected_dirs = ["tables", "images", "excel", "text"]
-    for subdir in expected_dirs:
-        subdir_path = test_data_dir / subdir
-        if not subdir_path.exists():
-            print(f"Warning: {subdir} directory not found in test_data")
 
-    return test_data_dir
+def _read_test_file(existing_files, relpath):
+    """Read a test_data file, or return None if it is missing."""
+    path = existing_files.get(relpath)
+    return path.read_bytes() if path is not None else None
 
 
-@pytest.mark.asyncio
-async def test_process_pdf_document(mock_processor, test_data_dir):
-    """Test PDF document processing with Gemini multimodal analysis.
-
-    This test verifies that PDF files are correctly:
-    - Converted from PDF to images using pdf2image
-    - Processed with mock Gemini analysis for each page
-    - Chunked with proper metadata including page numbers
-    - Handled with appropriate error handling
-    """
-    pdf_file = test_data_dir / "tables" / "simple_table.pdf"
+@pytest.fixture(scope="session")
+def pdf_table_bytes(existing_files):
+    """Bytes of tables/simple_table.pdf, read once per session."""
+    return _read_test_file(existing_files, "tables/simple_table.pdf")
 
-    if not pdf_file.exists():
-        pytest.skip(f"Test PDF file not found: {pdf_file}")
 
-    with open(pdf_file, "rb") as f:
-        file_content = f.read()
+@pytest.fixture(scope="session")
+def image_png_bytes(existing_files):
+    """Bytes of images/image_with_text.png, read once per session."""
+    return _read_test_file(existing_files, "images/image_with_text.png")
 
-    chunks = await mock_processor.process_document(
-        file_content, "simple_table.pdf", "application/pdf"
-    )
 
-    assert len(chunks) > 0
-    assert all(chunk.chunk_id for chunk in chunks)
-    assert all(chunk.content for chunk in chunks)
-    assert all(chunk.metadata["type"] == "pdf_page" for chunk in chunks)
-    assert all(chunk.metadata["processor"] == "gemini_mock" for chunk in chunks)
+@pytest.fixture(scope="session")
+def excel_xlsx_bytes(existing_files):
+    """Bytes of excel/sample_data.xlsx, read once per session."""
+    return _read_test_file(existing_files, "excel/sample_data.xlsx")
 
 
-@pytest.mark.asyncio
-async def test_process_image_document(mock_processor, test_data_dir):
-    """Test image document processing with Gemini vision capabilities.
-
-    This test verifies that image files are correctly:
-    - Processed with mock Gemini vision analysis
-    - Analyzed for text, tables, and diagram content
-    - Chunked as single chunks with image metadata
-    - Handled with appropriate content type detection
-    """
-    image_file = test_data_dir / "images" / "image_with_text.png"
-
-    if not image_file.exists():
-        pytest.skip(f"Test image file not found: {image_file}")
+@pytest.fixture(scope="session")
+def text_pdf_bytes(existing_files):
+    """Bytes of text/sample_text.pdf, read once per session."""
+    return _read_test_file(existing_files, "text/sample_text.pdf")
 
-    with open(image_file, "rb") as f:
-        file_content = f.read()
 
-    chunks = await mock_processor.process_document(
-        file_content, "image_with_text.png", "image/png"
-    )
-
-    assert len(chunks) == 1
-    assert chunks[0].chunk_id == "image_with_text.png_image"
-    assert chunks[0].content
-    assert chunks[0].metadata["type"] == "image"
-    assert chunks[0].metadata["processor"] == "gemini_mock"
-
-
-@pytest.mark.asyncio
-async def test_process_excel_document(mock_processor, test_data_dir):
-    """Test Excel document processing with pandas data extraction.
-
-    This test verifies that Excel files are correctly:
-    - Read using pandas with proper sheet detection
-    - Processed to extract structured data from multiple sheets
-    - Converted to descriptive text format for chunking
-    - Chunked with sheet-specific metadata and statistics
-    """
-    excel_file = test_data_dir / "excel" / "sample_data.xlsx"
-
-    if not excel_file.exists():
-        pytest.skip(f"Test Excel file not found: {excel_file}")
-
-    with open(excel_file, "rb") as f:
-        file_content = f.read()
+@pytest.fixture(scope="session")
+def verify_test_data_files(test_data_dir, existing_files):
+    """Verify that test_data directory exists and contains expected files."""
+    assert existing_files, f"test_data directory not found: {test_data_dir}"
 
-    chunks = await mock_processor.process_document(
-        file_content,
-        "sample_data.xlsx",
-        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-    )
+    # Check for expected subdirectories
+    present_dirs = {relpath.split("/", 1)[0] for relpath in existing_files}
+    for subdir in sorted(_EXPECTED_DATA_DIRS - present_dirs):
+        print(f"Warning: {subdir} directory not found in test_data")
 
-    assert len(chunks) > 0
-    assert all(chunk.chunk_id for chunk in chunks)
-    assert all(chunk.content for chunk in chunks)
-    assert all(chunk.metadata["type"] == "excel_sheet" for chunk in chunks)
-    assert all(chunk.metadata["processor"] == "pandas" for chunk in chunks)
+    return test_data_dir
 
 
+@pytest.mark.parametrize(
+    "bytes_fixture,relpath,content_type,expected_type,expected_processor,expected_chunk_id",
+    [
+        (
+            "pdf_table_bytes", "tables/simple_table.pdf", "application/pdf",
+            "pdf_page", "gemini_mock", "simple_table.pdf_page_1",
+        ),
+        (
+            "image_png_bytes", "images/image_with_text.png", "image/png",
+            "image", "gemini_mock", "image_with_text.png_image",
+        ),
+        (
+            "excel_xlsx_bytes", "excel/sample_data.xlsx", _XLSX_MIME,
+            "excel_sheet", "pandas", "sample_data.xlsx_sheet_Sales_Data",
+        ),
+        (
+            "text_pdf_bytes", "text/sample_text.pdf", "application/pdf",
+            "pdf_page", "gemini_mock", "sample_text.pdf_page_1",
+        ),
+    ],
+    ids=["pdf", "image", "excel", "text"],
+)
 @pytest.mark.asyncio
-async def test_process_text_document(mock_processor, test_data_dir):
-    """Test text document processing with standard text chunking.
-
-    This test verifies that text documents are correctly:
-    - Processed as PDF files (since our test data uses PDF format)
-    - Converted to images and analyzed with Gemini
-    - Chunked with appropriate text processing metadata
-    - Handled with proper content type detection
+async def test_process_document(
+    request,
+    mock_processor,
+    bytes_fixture,
+    relpath,
+    content_type,
+    expected_type,
+    expected_processor,
+    expected_chunk_id,
+):
+    """Test document processing for each supported file type.
+
+    This test verifies that each test_data file is correctly:
+    - Routed to the processor for its content type (Gemini mock or pandas)
+    - Chunked into non-empty chunks (a single chunk for images)
+    - Given the expected chunk ID for the first chunk
+    - Tagged with the expected chunk type and processor metadata
     """
-    text_file = test_data_dir / "text" / "sample_text.pdf"
-
-    if not text_file.exists():
-        pytest.skip(f"Test text file not found: {text_file}")
-
-    with open(text_file, "rb") as f:
-        file_content = f.read()
-
-    chunks = await mock_processor.process_document(
-        file_content, "sample_text.pdf", "application/pdf"
-    )
-
-    assert len(chunks) > 0
+    file_content = request.getfixturevalue(bytes_fixture)
+    if file_content is None:
+        pytest.skip(f"Test file not found: {relpath}")
+    filename = relpath.rsplit("/", 1)[-1]
+
+    chunks = await mock_processor.process_document(file_content, filename, content_type)
+
+    if expected_type == "image":
+        assert len(chunks) == 1
+    else:
+        assert len(chunks) > 0
+    assert chunks[0].chunk_id == expected_chunk_id
     assert all(chunk.chunk_id for chunk in chunks)
     assert all(chunk.content for chunk in chunks)
-    assert all(chunk.metadata["type"] == "pdf_page" for chunk in chunks)
+    assert all(chunk.metadata["type"] == expected_type for chunk in chunks)
+    assert all(chunk.metadata["processor"] == expected_processor for chunk in chunks)
 
 
 @pytest.mark.asyncio
@@ -287,7 +299,7 @@ async def test_unsupported_file_format(mock_processor):
 
 
 @pytest.mark.asyncio
-async def test_chunking_strategy_selection(mock_processor, test_data_dir):
+async def test_chunking_strategy_selection(mock_processor, pdf_table_bytes, image_png_bytes):
     """Test intelligent chunking strategy selection based on file types.
 
     This test verifies that the system correctly:
@@ -297,13 +309,9 @@ async def test_chunking_strategy_selection(mock_processor, test_data_dir):
     - Maintains consistent metadata structure across different strategies
     """
     # Test PDF chunking strategy with real PDF from test_data
-    pdf_file = test_data_dir / "tables" / "simple_table.pdf"
-
-    if not pdf_file.exists():
-        pytest.skip(f"Test PDF file not found: {pdf_file}")
-
-    with open(pdf_file, "rb") as f:
-        pdf_content = f.read()
+    if pdf_table_bytes is None:
+        pytest.skip("Test PDF file not found: tables/simple_table.pdf")
+    pdf_content = pdf_table_bytes
 
     pdf_chunks = await mock_processor._process_pdf_with_gemini(
         pdf_content, "simple_table.pdf"
@@ -312,13 +320,9 @@ async def test_chunking_strategy_selection(mock_processor, test_data_dir):
     assert all(chunk.metadata["type"] == "pdf_page" for chunk in pdf_chunks)
 
     # Test image chunking strategy with real image from test_data
-    image_file = test_data_dir / "images" / "image_with_text.png"
-
-    if not image_file.exists():
-        pytest.skip(f"Test image file not found: {image_file}")
-
-    with open(image_file, "rb") as f:
-        image_content = f.read()
+    if image_png_bytes is None:
+        pytest.skip("Test image file not found: images/image_with_text.png")
+    image_content = image_png_bytes
 
     image_chunks = await mock_processor._process_image_with_gemini(
         image_content, "image_with_text.png"
@@ -328,7 +332,7 @@ async def test_chunking_strategy_selection(mock_processor, test_data_dir):
 
 
 @pytest.mark.asyncio
-async def test_chunk_metadata_structure(mock_processor, test_data_dir):
+async def test_chunk_metadata_structure(mock_processor, pdf_table_bytes):
     """Test comprehensive chunk metadata structure and validation.
 
     This test verifies that all chunks have proper metadata including:
@@ -337,13 +341,9 @@ async def test_chunk_metadata_structure(mock_processor, test_data_dir):
     - Consistent metadata structure across different file types
     - Proper data types and values for all metadata fields
     """
-    pdf_file = test_data_dir / "tables" / "simple_table.pdf"
-
-    if not pdf_file.exists():
-        pytest.skip(f"Test PDF file not found: {pdf_file}")
-
-    with open(pdf_file, "rb") as f:
-        file_content = f.read()
+    if pdf_table_bytes is None:
+        pytest.skip("Test PDF file not found: tables/simple_table.pdf")
+    file_content = pdf_table_bytes
 
     chunks = await mock_processor.process_document(
         file_content, "simple_table.pdf", "application/pdf"
@@ -362,7 +362,7 @@ async def test_chunk_metadata_structure(mock_processor, test_data_dir):
 
 
 @pytest.mark.asyncio
-async def test_chunk_content_quality(mock_processor, test_data_dir):
+async def test_chunk_content_quality(mock_processor, excel_xlsx_bytes):
     """Test chunk content quality and meaningful data extraction.
 
     This test verifies that chunk content is:
@@ -371,18 +371,12 @@ async def test_chunk_content_quality(mock_processor, test_data_dir):
     - Includes appropriate keywords for the content type
     - Maintains data integrity through the processing pipeline
     """
-    excel_file = test_data_dir / "excel" / "sample_data.xlsx"
-
-    if not excel_file.exists():
-        pytest.skip(f"Test Excel file not found: {excel_file}")
-
-    with open(excel_file, "rb") as f:
-        file_content = f.read()
+    if excel_xlsx_bytes is None:
+        pytest.skip("Test Excel file not found: excel/sample_data.xlsx")
+    file_content = excel_xlsx_bytes
 
     chunks = await mock_processor.process_document(
-        file_content,
-        "sample_data.xlsx",
-        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        file_content, "sample_data.xlsx", _XLSX_MIME
     )
 
     for chunk in chunks:
@@ -390,10 +384,7 @@ async def test_chunk_content_quality(mock_processor, test_data_dir):
         assert chunk.content.strip()
 
         # Content should contain structured information
-        assert any(
-            keyword in chunk.content.lower()
-            for keyword in ["sheet", "column", "row", "data", "dimensions"]
-        )
+        assert _STRUCTURE_KEYWORDS.search(chunk.content)
 
         # Metadata should contain sheet information
         if chunk.metadata["type"] == "excel_sheet":
@@ -403,7 +394,7 @@ async def test_chunk_content_quality(mock_processor, test_data_dir):
 
 
 @pytest.mark.asyncio
-async def test_multiple_file_types_processing(mock_processor, test_data_dir):
+async def test_multiple_file_types_processing(mock_processor, pdf_table_bytes, image_png_bytes, excel_xlsx_bytes):
     """Test end-to-end processing of multiple file types in sequence.
 
     This comprehensive test verifies that the system can:
@@ -414,36 +405,34 @@ async def test_multiple_file_types_processing(mock_processor, test_data_dir):
     - Scale processing capabilities for diverse document collections
     """
     test_files = [
-        ("tables/simple_table.pdf", "application/pdf"),
-        ("images/image_with_text.png", "image/png"),
-        (
-            "excel/sample_data.xlsx",
-            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        ),
+        ("simple_table.pdf", "application/pdf", pdf_table_bytes),
+        ("image_with_text.png", "image/png", image_png_bytes),
+        ("sample_data.xlsx", _XLSX_MIME, excel_xlsx_bytes),
     ]
 
-    results = {}
-
-    for file_path, content_type in test_files:
-        full_path = test_data_dir / file_path
-
-        if not full_path.exists():
-            print(f"Skipping {file_path} - file not found in test_data")
+    available_files = []
+    for filename, content_type, file_content in test_files:
+        if file_content is None:
+            print(f"Skipping {filename} - file not found in test_data")
             continue
+        available_files.append((filename, content_type, file_content))
 
-        with open(full_path, "rb") as f:
-            file_content = f.read()
-
-        filename = full_path.name
-        chunks = await mock_processor.process_document(
-            file_content, filename, content_type
+    # The files are independent, so process them concurrently
+    all_chunks = await asyncio.gather(
+        *(
+            mock_processor.process_document(file_content, filename, content_type)
+            for filename, content_type, file_content in available_files
         )
+    )
 
-        results[filename] = {
+    results = {
+        filename: {
             "chunks_count": len(chunks),
             "content_types": [chunk.metadata["type"] for chunk in chunks],
             "processors": [chunk.metadata["processor"] for chunk in chunks],
         }
+        for (filename, _, _), chunks in zip(available_files, all_chunks)
+    }
 
     # Verify we processed at least one file from test_data
     assert len(results) > 0, "No files from test_data folder were processed"
@@ -12,6 +12,20 @@ def chunking_strategy():
     return ChunkingStrategy()
 
 
+@pytest.fixture(scope="module")
+def many_chunks():
+    """Twenty small chunks, built once per module (optimize_chunks does not mutate them)."""
+    return tuple(
+        ChunkInfo.model_construct(
+            chunk_id=f"chunk_{i}",
+            content=f"Content {i}",
+            chunk_index=i,
+            metadata={"type": "text"},
+        )
+        for i in range(20)
+    )
+
+
 @pytest.mark.asyncio
 async def test_chunk_text_basic(chunking_strategy):
     """Test basic text chunking."""
@@ -76,20 +90,9 @@ async def test_optimize_chunks_under_limit(chunking_strategy, sample_chunks):
 
 
 @pytest.mark.asyncio
-async def test_optimize_chunks_over_limit(chunking_strategy):
+async def test_optimize_chunks_over_limit(chunking_strategy, many_chunks):
     """Test chunk optimization when over limit."""
-    # Create many chunks
-    chunks = [
-        ChunkInfo(
-            chunk_id=f"chunk_{i}",
-            content=f"Content {i}",
-            chunk_index=i,
-            metadata={"type": "text"},
-        )
-        for i in range(20)
-    ]
-
-    optimized = await chunking_strategy.optimize_chunks(chunks, 5)
+    optimized = await chunking_strategy.optimize_chunks(list(many_chunks), 5)
     assert len(optimized) <= 5
 
 